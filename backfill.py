@@ -0,0 +1,189 @@
+import signal
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+
+import metrics
+from database import FEED_QUERIES, LOCALES, MEMBERS, fetch_feed, google_news_feed, make_session
+from scheduler import run_lock
+from storage import (DB_PATH, begin_news_write, bulk_mode, close_all, cluster_news_since, connection,
+                     insert_news_many, load_backfill_done, save_backfill_window, tag_news_since, to_db_time)
+
+# ==========================================
+# ⚙️ 歷史回補設定 (Backfill Configuration)
+# ==========================================
+# fetch_job 只看得到每個關鍵字「現在」最上面幾則；回補把一段日期切成很多小區間，
+# 用 Google News 的 after: / before: 分別搜尋，每個區間抓完就記在資料庫，中斷後從沒做完的接著跑
+WINDOW_DAYS = 7          # 每個區間幾天 (Google News 一次最多回約 100 則，熱門時期可以切小一點)
+MAX_WORKERS = 4          # 同時進行的請求數
+RATE = 1.0               # 全部執行緒加起來每秒最多幾個請求
+BURST = 3                # 令牌桶容量：閒置之後最多可以一口氣發幾個
+PROGRESS_EVERY = 50      # 每完成幾個區間印一次進度
+LOCK_PATH = DB_PATH + ".backfill.lock"
+
+
+# ==========================================
+# 🪣 全域速率限制 (Token Bucket)
+# ==========================================
+class TokenBucket:
+    """每秒補 rate 個令牌，最多存 capacity 個；每個請求拿一個，沒有就等"""
+
+    def __init__(self, rate=RATE, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        """拿到令牌回傳 True；等待中 stop 被設定就回傳 False"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                delay = (1 - self._tokens) / self.rate
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                return False
+
+
+# ==========================================
+# 📅 日期區間 (Date Windows)
+# ==========================================
+def date_windows(since, until, days=WINDOW_DAYS):
+    """把 [since, until) 切成每段 days 天：[(after, before)]，都是 'YYYY-MM-DD'"""
+    windows = []
+    start = since
+    while start < until:
+        end = min(start + timedelta(days=days), until)
+        windows.append((start.isoformat(), end.isoformat()))
+        start = end
+    return windows
+
+
+def backfill_feeds(since, until, days=WINDOW_DAYS, queries=None, locales=None):
+    """每個 (關鍵字, 語系, 區間) 一個來源設定；新的區間排前面，先補最近的"""
+    feeds = []
+    for after, before in reversed(date_windows(since, until, days)):
+        for query in queries or FEED_QUERIES:
+            for locale in locales or LOCALES:
+                feed = google_news_feed(f"{query} after:{after} before:{before}", locale,
+                                        member=query if query in MEMBERS else None)
+                feed["item_limit"] = None  # 區間裡有幾則就拿幾則
+                feed["window"] = (query, locale, after, before)
+                feeds.append(feed)
+    return feeds
+
+
+# ==========================================
+# 🔁 回補 (Backfill Run)
+# ==========================================
+def _fetch_window(session, bucket, feed, stop):
+    if not bucket.acquire(stop):
+        return None
+    return fetch_feed(session, feed)
+
+
+def _write_window(conn, feed, items):
+    """一個區間的新聞、成員標記、分群與進度記錄在同一個 transaction 裡寫入，回傳新增筆數
+
+    回補和排程抓取 (serve / ingest) 可以同時跑，寫入鎖由 begin_news_write() 排隊；
+    抓取任務一次寫很多則時可能等超過 busy_timeout，這時只把這個區間當成失敗，下次回補再試。
+    """
+    fetched_at = to_db_time(datetime.now(timezone.utc))
+    try:
+        with conn:
+            since_id = begin_news_write(conn)
+            stored = insert_news_many(conn, items, fetched_at)
+            tag_news_since(conn, since_id)
+            cluster_news_since(conn, since_id)
+            save_backfill_window(conn, feed["window"], len(items), stored, fetched_at)
+    except sqlite3.OperationalError as e:
+        if "locked" not in str(e):
+            raise
+        print(f"  ⚠️ 資料庫忙碌中，區間 {feed['window']} 下次再補")
+        return None
+    return stored
+
+
+def run(feeds, max_workers=MAX_WORKERS, rate=RATE, burst=BURST, stop=None):
+    """抓完 feeds 裡還沒做過的區間，回傳 {"windows", "skipped", "errors", "items", "stored"}
+
+    同時最多 max_workers 個請求，所有請求共用一個令牌桶 (每秒 rate 個)；
+    每個區間在一個 transaction 裡寫完 (_write_window)，所以中斷後重跑不會漏也不會重複。
+    失敗的區間不記錄，下次會再試。LOCK_PATH 只擋住同時跑兩個回補，不會擋排程抓取。
+    """
+    stop = stop or threading.Event()
+    bucket = TokenBucket(rate, burst)
+    counts = {"windows": 0, "skipped": 0, "errors": 0, "items": 0, "stored": 0}
+    started = time.perf_counter()
+
+    with run_lock(LOCK_PATH), connection() as conn:
+        done = load_backfill_done(conn)
+        todo = [feed for feed in feeds if feed["window"] not in done]
+        counts["skipped"] = len(feeds) - len(todo)
+        print(f"回補：共 {len(feeds)} 個區間，已完成 {counts['skipped']}，這次要抓 {len(todo)} 個。")
+
+        pending = iter(todo)
+        in_flight = {}
+        with make_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as pool, \
+                bulk_mode(conn):
+
+            def submit_next():
+                # 工作一個一個補進去，記憶體裡最多只有 2 * max_workers 個區間
+                feed = next(pending, None)
+                if feed is not None and not stop.is_set():
+                    in_flight[pool.submit(_fetch_window, session, bucket, feed, stop)] = feed
+
+            for _ in range(max_workers * 2):
+                submit_next()
+
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    feed = in_flight.pop(future)
+                    result = future.result()
+                    if result is None:
+                        continue
+                    stored = _write_window(conn, feed, result["items"]) if result["status"] == "ok" else None
+                    if stored is None:
+                        counts["errors"] += 1
+                    else:
+                        items = result["items"]
+                        counts["windows"] += 1
+                        counts["items"] += len(items)
+                        counts["stored"] += stored
+                        if counts["windows"] % PROGRESS_EVERY == 0:
+                            elapsed = time.perf_counter() - started
+                            left = len(todo) - counts["windows"] - counts["errors"]
+                            print(f"  已完成 {counts['windows']}/{len(todo)} 個區間，新增 {counts['stored']} 則，"
+                                  f"預估還要 {left * elapsed / counts['windows'] / 60:.0f} 分鐘")
+                    submit_next()
+
+    metrics.log_json("backfill", duration_s=round(time.perf_counter() - started, 3), **counts)
+    return counts
+
+
+def backfill(since, until=None, days=WINDOW_DAYS, queries=None, locales=None, max_workers=MAX_WORKERS,
+             rate=RATE, burst=BURST):
+    """命令列入口：回補 [since, until) 這段期間，Ctrl+C / SIGTERM 會等進行中的區間寫完才停"""
+    until = until or date.today() + timedelta(days=1)
+    stop = threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+    try:
+        counts = run(backfill_feeds(since, until, days, queries, locales), max_workers, rate, burst, stop)
+    finally:
+        close_all()
+    state = "已中斷，下次會從沒做完的區間繼續" if stop.is_set() else "完成"
+    print(f"回補{state}：抓了 {counts['windows']} 個區間 (失敗 {counts['errors']})，"
+          f"取得 {counts['items']} 則，新增 {counts['stored']} 則。")
+    return counts
@@ -0,0 +1,279 @@
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+from bs4 import BeautifulSoup
+
+import database
+import export
+import retention
+from storage import (close_all, cluster_news_since, connection, insert_news_many, latest_stories, search_stories,
+                     to_db_time)
+
+try:
+    import resource
+except ImportError:  # Windows 沒有 resource
+    resource = None
+
+# ==========================================
+# ⚙️ 測試設定 (Benchmark Configuration)
+# ==========================================
+# 完全離線：假的 RSS 由本機的 HTTP server 提供，資料庫用暫存檔
+DEFAULT_SIZES = [10, 1000, 100000]
+DEFAULT_REPEAT = 5
+READ_QUERIES = 200  # 儀表板讀取要量幾次
+
+
+# ==========================================
+# 📰 假資料 (Fixture Feeds)
+# ==========================================
+def make_feed(n_items, seed="bench"):
+    """產生一份有 n_items 則新聞的 RSS (bytes)，格式跟 Google News 一樣"""
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    members = database.MEMBERS
+    parts = ['<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>',
+             "<title>i-dle - Google News</title>",
+             f"<lastBuildDate>{format_datetime(start)}</lastBuildDate>"]
+    for i in range(n_items):
+        member = members[i % len(members)]
+        title = escape(f"(G)I-DLE {member} 新聞 #{i} 世界巡迴 tour - 媒體{i % 37}")
+        parts.append(
+            f"<item><title>{title}</title>"
+            f"<link>https://news.example.com/{seed}/{i}</link>"
+            f'<guid isPermaLink="false">{seed}-{i}</guid>'
+            f"<pubDate>{format_datetime(start + timedelta(minutes=i))}</pubDate>"
+            f"<description>{title}</description>"
+            f'<source url="https://outlet{i % 37}.example.com">媒體{i % 37}</source></item>'
+        )
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    feeds = {}
+
+    def do_GET(self):
+        body = self.feeds.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(feeds):
+    """在背景執行緒啟動本機 RSS server，回傳 (server, base_url)"""
+    _FeedHandler.feeds = feeds
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ==========================================
+# ⏱️ 量測工具 (Measurement)
+# ==========================================
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 回傳 bytes，Linux 回傳 KiB
+    return round(peak / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+
+def measure(stage, n_items, repeat, func, queries=None, setup=None):
+    """執行 func repeat 次，回傳延遲 p50/p99、吞吐量與目前的峰值 RSS
+
+    吞吐量預設是每秒處理幾則新聞；有給 queries (func 裡跑了幾次查詢) 時改成每秒幾次查詢。
+    有給 setup 時每次先在計時之外呼叫它，回傳值交給 func。
+    """
+    timings = []
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, round(0.99 * (len(timings) - 1)))]
+    work = queries or n_items
+    result = {
+        "stage": stage,
+        "items": n_items,
+        "repeat": repeat,
+        "p50_ms": round(p50 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "throughput_per_sec": round(work / p50, 1) if p50 > 0 else None,
+        "unit": "queries" if queries else "items",
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if queries:
+        result["queries"] = queries
+    print(f"  {stage:<18} {n_items:>7} 則  p50 {result['p50_ms']:>10.2f} ms  p99 {result['p99_ms']:>10.2f} ms  "
+          f"{result['throughput_per_sec'] or 0:>12,.0f} {'次' if queries else '則'}/秒")
+    return result
+
+
+# ==========================================
+# 🧪 各階段 (Stages)
+# ==========================================
+def bench_size(n_items, repeat, session, base_url, workdir):
+    results = []
+    path = f"/feed-{n_items}.xml"
+    body = _FeedHandler.feeds[path]
+
+    # 1. 下載
+    results.append(measure("download", n_items, repeat,
+                           lambda: session.get(base_url + path, timeout=database.REQUEST_TIMEOUT).content))
+
+    # 2. 解析：BeautifulSoup 整份 vs lxml 串流 (都解析全部，比較公平)
+    def parse_bs4():
+        soup = BeautifulSoup(body.decode("utf-8"), "xml")
+        return [database.parse_item(item) for item in soup.find_all("item")]
+
+    def parse_stream():
+        return list(database.iter_items(io.BytesIO(body)))
+
+    results.append(measure("parse_bs4", n_items, repeat, parse_bs4))
+    results.append(measure("parse_stream", n_items, repeat, parse_stream))
+    # 正式抓取只取前 ITEM_LIMIT 則，串流解析可以提早停
+    results.append(measure("parse_stream_top", n_items, repeat,
+                           lambda: list(database.iter_items(io.BytesIO(body), database.ITEM_LIMIT))))
+
+    # 3. 寫入資料庫 (每次都用新的資料庫) 與 4. 去重 (同一批再寫一次，全部都應該被略過)
+    items = parse_stream()
+    fetched_at = to_db_time(datetime.now(timezone.utc))
+    db_paths = []
+
+    def fresh_db(prefix):
+        # 建檔和跑完所有 migration 都在計時之外先做好，量到的只有寫入本身
+        db_path = os.path.join(workdir, f"{prefix}-{n_items}-{len(db_paths)}.db")
+        db_paths.append(db_path)
+        with connection(db_path):
+            pass
+        return db_path
+
+    def insert(db_path):
+        with connection(db_path) as conn, conn:
+            insert_news_many(conn, items, fetched_at)
+
+    results.append(measure("db_insert", n_items, repeat, insert, setup=lambda: fresh_db("insert")))
+
+    # 3b. 寫入 + 近似重複分群 (跟 db_insert 的差就是分群的成本)
+    def insert_cluster(db_path):
+        with connection(db_path) as conn, conn:
+            insert_news_many(conn, items, fetched_at)
+            cluster_news_since(conn, 0)
+
+    results.append(measure("db_insert_cluster", n_items, repeat, insert_cluster, setup=lambda: fresh_db("cluster")))
+
+    def dedup():
+        with connection(db_paths[-1]) as conn, conn:
+            assert insert_news_many(conn, items, fetched_at) == 0
+
+    results.append(measure("dedup", n_items, repeat, dedup))
+
+    # 5. 儀表板讀取 (get_member_news 的那一頁，以及全文搜尋；都已經依群合併)
+    def read_page():
+        with connection(db_paths[-1]) as conn:
+            for _ in range(READ_QUERIES):
+                latest_stories(conn, 20)
+
+    def read_search():
+        with connection(db_paths[-1]) as conn:
+            for _ in range(READ_QUERIES):
+                search_stories(conn, "Soyeon tour", 20)
+
+    results.append(measure("read_latest", n_items, repeat, read_page, queries=READ_QUERIES))
+    results.append(measure("read_search", n_items, repeat, read_search, queries=READ_QUERIES))
+
+    # 6. 封存後從匯出檔重建：假資料的群都延續到最後一則，保留期切在最後一則之後就全部封存；
+    #    重建時這些舊新聞要直接回到封存資料庫，主資料庫不會又長回來
+    db_path = db_paths[-1]
+    archive_path = os.path.join(workdir, f"archive-{n_items}.db")
+    export_dir = os.path.join(workdir, f"exports-{n_items}")
+    newest = datetime.fromisoformat(max(item["pub_date"] for item in items)).replace(tzinfo=timezone.utc)
+    days = (datetime.now(timezone.utc) - newest - timedelta(minutes=1)).total_seconds() / 86400
+    retention.run(days, db_path, archive_path, vacuum=False, export_dir=export_dir)
+    with connection(db_path) as conn:
+        hot_rows = conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+
+    def rebuild():
+        export.rebuild(db_path, export_dir, days, archive_path)
+        with connection(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM members").fetchone()[0] == hot_rows
+
+    results.append(measure("rebuild", n_items, repeat, rebuild))
+    return results
+
+
+def run(sizes=None, repeat=DEFAULT_REPEAT):
+    sizes = sizes or DEFAULT_SIZES
+    feeds = {f"/feed-{n}.xml": make_feed(n) for n in sizes}
+    server, base_url = start_server(feeds)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir, database.make_session() as session:
+            for n_items in sizes:
+                print(f"[{n_items} 則]")
+                results.extend(bench_size(n_items, repeat, session, base_url, workdir))
+            close_all()
+    finally:
+        server.shutdown()
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(report, baseline):
+    """跟之前的結果比較 p50，變慢超過 20% 的階段標成 REGRESSION"""
+    before = {(r["stage"], r["items"]): r for r in baseline["results"]}
+    for r in report["results"]:
+        old = before.get((r["stage"], r["items"]))
+        if not old or not old["p50_ms"]:
+            continue
+        ratio = r["p50_ms"] / old["p50_ms"]
+        flag = "  REGRESSION" if ratio > 1.2 else ""
+        print(f"  {r['stage']:<16} {r['items']:>7} 則  {old['p50_ms']:>10.2f} → {r['p50_ms']:>10.2f} ms "
+              f"({ratio:.2f}x){flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="離線量測 抓取 → 解析 → 寫入 → 讀取 各階段的效能")
+    parser.add_argument("--items", type=int, nargs="+", default=DEFAULT_SIZES, help="每份假 RSS 的新聞數量")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="每個階段重複幾次")
+    parser.add_argument("--output", default="benchmark_results.json", help="結果寫到哪個 JSON 檔")
+    parser.add_argument("--baseline", help="之前的結果 JSON，拿來比較是否變慢")
+    args = parser.parse_args(argv)
+
+    report = run(args.items, args.repeat)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"結果已寫入 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import hashlib
+import operator
+import re
+import struct
+import unicodedata
+
+# ==========================================
+# ⚙️ 近似重複設定 (Near-duplicate Configuration)
+# ==========================================
+# 同一則新聞被不同媒體改寫後，標題的 3-gram 大部分還是一樣；
+# MinHash 估計兩個標題 3-gram 集合的 Jaccard 相似度，LSH 分桶讓新標題只跟「可能相似」的幾則比
+SHINGLE_SIZE = 3
+BANDS = 20               # LSH 分幾段
+ROWS = 3                 # 每段幾個 hash；相似度 0.5 的兩則約 93% 會落到同一桶，0.3 的約 42%
+NUM_PERM = BANDS * ROWS
+SIMILARITY = 0.5         # 估計的 Jaccard 相似度達到這個值才算同一則新聞
+# 只差一個成員名字的標題 (「Soyeon 發個人專輯」/「Yuqi 發個人專輯」) 相似度可以到 0.8，
+# 調高門檻分不開，反而會拆散真的改寫 (同一則新聞不同媒體的標題常常只有 0.5 左右)；
+# 所以另外要求兩則標題提到的成員 (tagger.tag_members) 一樣才合併，見 storage.cluster_news_since
+
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}I")
+
+
+# ==========================================
+# ✂️ 標題切片 (Shingling)
+# ==========================================
+def _strip_outlet(title):
+    # Google News 的標題結尾是 " - 媒體名稱"，同一則新聞每家媒體都不同，比對前先拿掉
+    head, sep, _ = title.rpartition(" - ")
+    return head if sep and head else title
+
+
+def shingles(title):
+    """標題的字元 3-gram 集合 (NFKC + casefold，標點符號當成空白)；中韓文沒有空白也能比"""
+    text = unicodedata.normalize("NFKC", _strip_outlet(title or "")).casefold()
+    text = " ".join(re.sub(r"[\W_]+", " ", text).split())
+    if len(text) < SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+# ==========================================
+# 🔢 MinHash 簽章與 LSH 分桶 (Signatures & Buckets)
+# ==========================================
+def _hashes(shingle):
+    # SHAKE-128 一次吐出 NUM_PERM 個互相獨立的 32-bit hash，不用在 Python 裡算 NUM_PERM 次排列
+    return _SIGNATURE.unpack(hashlib.shake_128(shingle.encode("utf-8")).digest(_SIGNATURE.size))
+
+
+def signature(title):
+    """標題的 MinHash 簽章 (NUM_PERM 個 32-bit 整數)；標題是空的回傳 None"""
+    hashes = [_hashes(s) for s in shingles(title)]
+    if not hashes:
+        return None
+    # 每個 hash 函數各取最小值 (zip 轉置後 min 都在 C 裡做)
+    return list(map(min, zip(*hashes)))
+
+
+def similarity(sig_a, sig_b):
+    """從兩個簽章估計 Jaccard 相似度"""
+    return sum(map(operator.eq, sig_a, sig_b)) / NUM_PERM
+
+
+def bands(sig):
+    """LSH 分桶：回傳 [(band, bucket)]，bucket 是 64-bit 有號整數 (SQLite INTEGER 放得下)"""
+    buckets = []
+    for band in range(BANDS):
+        rows = sig[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f"<{ROWS}I", *rows), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "little", signed=True)))
+    return buckets
+
+
+def pack(sig):
+    return _SIGNATURE.pack(*sig)
+
+
+def unpack(blob):
+    return _SIGNATURE.unpack(blob)
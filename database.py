@@ -1,45 +1,434 @@
+import argparse
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-import sqlite3
+from lxml import etree
+import hashlib
+import html
+import re
+import threading
 import time
-from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote_plus, urlparse
+
+import metrics
+from storage import (BATCH_SIZE, begin_news_write, bulk_mode, cluster_news_since, connection, db_size,
+                     insert_news_many, item_key, load_feed_states, save_feed_state, save_run_summary, tag_news_since,
+                     to_db_time)
+
+# ==========================================
+# ⚙️ 抓取設定 (Feed Configuration)
+# ==========================================
+GOOGLE_NEWS_RSS = "https://news.google.com/rss/search?q={query}&hl={hl}&gl={gl}&ceid={ceid}"
+
+# Google News 的語系參數
+LOCALES = {
+    "zh-TW": {"hl": "zh-TW", "gl": "TW", "ceid": "TW:zh-Hant"},
+    "ko": {"hl": "ko", "gl": "KR", "ceid": "KR:ko"},
+    "en": {"hl": "en-US", "gl": "US", "ceid": "US:en"},
+}
+
+MEMBERS = ["Miyeon", "Minnie", "Soyeon", "Yuqi", "Shuhua"]
+
+# 要追蹤的關鍵字 (團名、成員、專輯)
+FEED_QUERIES = [
+    "i-dle", "(G)I-DLE",
+    *MEMBERS,
+    "i-dle 2 Super Lady", "i-dle I feel", "i-dle I NEVER DIE",
+]
+
+ITEM_LIMIT = 3           # 每個來源只保留最新幾則
+MAX_WORKERS = 8          # 同時抓取的來源數量
+PER_HOST_LIMIT = 4       # 對同一個網站最多同時幾個連線，避免被擋
+REQUEST_TIMEOUT = (5, 15)  # (連線, 讀取) 秒數
+PARSER = "stream"        # "stream"：lxml 邊下載邊解析；"bs4"：整份交給 BeautifulSoup
+SUMMARY_CHARS = 500      # RSS <description> 最多留幾個字 (當作還沒補抓內文時的摘要)
+
+
+def google_news_feed(query, locale="zh-TW", member=None):
+    """組出一個 Google News RSS 來源設定；member 會標記在這個來源抓到的新聞上"""
+    params = LOCALES[locale]
+    url = GOOGLE_NEWS_RSS.format(query=quote_plus(query), **params)
+    return {"name": f"{query} [{locale}]", "url": url, "member": member}
+
+
+def default_feeds():
+    return [google_news_feed(q, loc, member=q if q in MEMBERS else None)
+            for q in FEED_QUERIES for loc in LOCALES]
+
+
+# ==========================================
+# 🌐 HTTP 連線 (Pooled Session)
+# ==========================================
+_host_locks = {}
+_host_locks_guard = threading.Lock()
+
+
+def _host_slot(url):
+    """每個網站一個 Semaphore，限制同時連線數"""
+    host = urlparse(url).netloc
+    with _host_locks_guard:
+        if host not in _host_locks:
+            _host_locks[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return _host_locks[host]
+
+
+def make_session(max_workers=MAX_WORKERS):
+    # 共用同一個 Session，讓連線可以重複使用 (keep-alive)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# RSS 每次都會更新 lastBuildDate，算 hash 前先拿掉，內容沒變才會得到同一個值
+_VOLATILE_TAGS = re.compile(rb"<lastBuildDate>.*?</lastBuildDate>", re.S)
+
+
+def body_hash(content):
+    return hashlib.sha256(_VOLATILE_TAGS.sub(b"", content)).hexdigest()
+
+
+def parse_pub_date(text):
+    """RSS 的 pubDate (RFC 822) 轉成資料庫時間格式，格式不對就回傳 None"""
+    if not text:
+        return None
+    try:
+        return to_db_time(parsedate_to_datetime(text.strip()))
+    except (TypeError, ValueError):
+        return None
+
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+
+
+def feed_summary(description, title, source=None):
+    """RSS 的 <description> (HTML) 轉成純文字摘要；只是重複標題和媒體名稱的 (Google News 大多如此) 回傳 None"""
+    if not description:
+        return None
+    text = " ".join(html.unescape(_HTML_TAG.sub(" ", description)).split())
+    rest = text
+    # Google News 的標題結尾會加上 " - 媒體名稱"，摘要裡的連結文字沒有
+    for piece in (title, title.rpartition(" - ")[0], source):
+        if piece:
+            rest = rest.replace(piece, " ")
+    if not any(ch.isalnum() for ch in rest):
+        return None
+    return text[:SUMMARY_CHARS]
+
+
+def _make_item(title, guid, link, pub_date, source, description):
+    return {
+        "title": title,
+        "link": link,
+        "source": source,
+        "pub_date": parse_pub_date(pub_date),
+        "key": item_key(guid, link, title),
+        "summary": feed_summary(description, title, source),
+    }
+
+
+def parse_item(item):
+    return _make_item(
+        item.title.text if item.title else "",
+        item.guid.text if item.guid else None,
+        item.link.text if item.link else None,
+        item.pubDate.text if item.pubDate else None,
+        item.source.text if item.source else None,
+        item.description.text if item.description else None,
+    )
+
+
+def _element_item(element):
+    return _make_item(
+        element.findtext("title") or "",
+        element.findtext("guid"),
+        element.findtext("link"),
+        element.findtext("pubDate"),
+        element.findtext("source"),
+        element.findtext("description"),
+    )
+
+
+def iter_items(stream, limit=None, seen=None):
+    """邊讀邊解析 RSS，一次產生一則新聞
+
+    只在每個 <item> 結束時處理，處理完就把節點清掉，記憶體不會隨檔案變大。
+    拿到 limit 則，或碰到 seen 裡已經存過的 key 就停止，不再往下讀。
+    """
+    count = 0
+    for _, element in etree.iterparse(stream, events=("end",), tag="item"):
+        item = _element_item(element)
+        # 釋放已處理過的節點
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+        if seen and item["key"] in seen:
+            return
+        yield item
+        count += 1
+        if limit and count >= limit:
+            return
+
+
+def items_hash(items):
+    """串流模式沒有完整內容可以算 hash，改用實際取到的新聞算指紋"""
+    digest = hashlib.sha256()
+    for item in items:
+        digest.update(f"{item['key']}\t{item['title']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _CountingReader:
+    """包住 response.raw，記下串流解析實際讀了多少位元組"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes = 0
+
+    def read(self, size=-1):
+        chunk = self.raw.read(size)
+        self.bytes += len(chunk)
+        return chunk
+
+
+def _ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def fetch_feed(session, feed, state=None, parser=None):
+    """抓取單一來源並解析
+
+    state 是上次抓取留下的 ETag / Last-Modified / hash，會拿來發送條件式請求。
+    回傳 dict：status 為 "ok"、"not_modified"、"unchanged" 或 "error"；
+    只有 "ok" 才會帶 items 與新的 state。另外一律帶著量測數據：
+    http_ms (收到回應標頭)、body_ms (下載內容)、parse_ms (解析)、bytes、http_status。
+    feed 設定 stop_at_seen=True 時 (只適合依時間排序的來源)，讀到上次看過的新聞就停止；
+    設定 item_limit 可以改掉每個來源只取 ITEM_LIMIT 則的限制 (None 代表全部)。
+    """
+    state = state or {}
+    parser = parser or PARSER
+    limit = feed.get("item_limit", ITEM_LIMIT)
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    seen = set((state.get("last_keys") or "").split()) if feed.get("stop_at_seen") else None
+    stats = {"http_ms": None, "body_ms": None, "parse_ms": None, "bytes": 0, "http_status": None}
+
+    def result(status, **extra):
+        return {"status": status, **stats, **extra}
 
-def fetch_job():
-    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 啟動自動抓取任務...")
-# 1. 抓取外部資料 (需要強制指定編碼)
-    rss_url = "https://news.google.com/rss/search?q=i-dle&hl=zh-TW&gl=TW&ceid=TW:zh-Hant"
-       
     try:
-        response = requests.get(rss_url)
-        response.encoding = 'utf-8'  # 強制指定編碼
+        items = None
+        with _host_slot(feed["url"]):
+            started = time.perf_counter()
+            with session.get(feed["url"], headers=headers, timeout=REQUEST_TIMEOUT, stream=True) as response:
+                stats["http_ms"] = _ms(started)
+                stats["http_status"] = response.status_code
+                # 304：伺服器說沒變，連內容都不用下載
+                if response.status_code == 304:
+                    return result("not_modified")
+
+                if response.status_code != 200:
+                    print(f"[{feed['name']}] 抓取失敗，代碼：{response.status_code}")
+                    return result("error")
+
+                started = time.perf_counter()
+                if parser == "stream":
+                    # XML 自己會宣告編碼，直接把原始位元組交給 lxml
+                    # (邊下載邊解析，所以下載時間算在 parse_ms 裡)
+                    response.raw.decode_content = True
+                    reader = _CountingReader(response.raw)
+                    items = list(iter_items(reader, limit, seen))
+                    stats["parse_ms"] = _ms(started)
+                    stats["bytes"] = reader.bytes
+                    digest = items_hash(items)
+                else:
+                    content = response.content
+                    stats["body_ms"] = _ms(started)
+                    stats["bytes"] = len(content)
+                    digest = body_hash(content)
+
+        new_state = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body_hash": digest,
+        }
+        # 內容跟上次一模一樣 (或第一則就是看過的)：不解析、不寫資料庫
+        if digest == state.get("body_hash") or (seen and items == []):
+            return result("unchanged")
 
-        if response.status_code == 200:
+        if items is None:
+            started = time.perf_counter()
             # 這裡就是你說的「強制指定」，因為資料是從外面(網路)進來的
-             
-            soup = BeautifulSoup(response.text, 'xml')
-            items = soup.find_all('item')[:3]
+            soup = BeautifulSoup(content.decode("utf-8", errors="replace"), 'xml')
+            items = [parse_item(item) for item in soup.find_all('item')[:limit]]
+            stats["parse_ms"] = _ms(started)
+        new_state["last_keys"] = " ".join(item["key"] for item in items)
+        for item in items:
+            item["member"] = feed.get("member")
+        return result("ok", items=items, state=new_state)
+    except Exception as e:
+        print(f"[{feed['name']}] 發生錯誤：{e}")
+        return result("error", error=str(e))
+
+
+def fetch_all(feeds, states=None, max_workers=MAX_WORKERS):
+    """同時抓取所有來源，總耗時約等於最慢的那一個"""
+    states = states or {}
+    results = {}
+    with make_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_feed, session, feed, states.get(feed["url"])): feed for feed in feeds}
+        for future in as_completed(futures):
+            results[futures[future]["url"]] = future.result()
+    return results
+
+
+def fetch_job(feeds=None, max_workers=MAX_WORKERS, batch_size=BATCH_SIZE, bulk=False):
+    """抓取所有來源並寫入資料庫
+
+    整個 run 的新聞只用一個 transaction、分批 executemany 寫入；
+    bulk=True (大量回補時) 會暫時換上 storage.BULK_PRAGMAS 加速寫入。
+    回傳每個來源的結果 {url: {"status": ...}}；整個任務失敗時回傳 None。
+    每個階段的耗時與數量會寫進 JSON log、Prometheus 文字檔與 fetch_runs 表 (見 metrics.py)。
+    """
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 啟動自動抓取任務...")
+    feeds = feeds if feeds is not None else default_feeds()
+    started = time.perf_counter()
+    started_at = datetime.now().isoformat(timespec="seconds")
+    fetched_at = to_db_time(datetime.now(timezone.utc))
+
+    try:
+        with connection() as conn:
+            states = load_feed_states(conn)
+
+            # 1. 抓取外部資料 (多個來源同時進行)
+            results = fetch_all(feeds, states, max_workers)
+            changed = {url: r for url, r in results.items() if r["status"] == "ok"}
+            counts = Counter(r["status"] for r in results.values())
 
             # 2. 存入內部資料庫 (這裡不需要再指定，因為 Python 與 SQLite 已經有默契了)
-            conn = sqlite3.connect('idle_data.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS members (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT,
-                    news TEXT
-                )
-            ''')
-            
-            for item in items:
-                # 直接存入，Python 會自動處理好
-                cursor.execute("INSERT INTO members (name, news) VALUES (?, ?)", ("i-dle News", item.title.text))
-            
-            conn.commit()
-            conn.close()
-            print("任務完成：資料已成功存入資料庫。")
-        else:
-            print(f"抓取失敗，代碼：{response.status_code}")
-            
+            #    全部來源都沒變的話，連一筆都不用寫
+            stored = 0
+            db_write_ms = 0
+            if changed:
+                write_started = time.perf_counter()
+                with bulk_mode(conn) if bulk else nullcontext(), conn:
+                    items = (item for r in changed.values() for item in r["items"])
+                    since_id = begin_news_write(conn)
+                    stored = insert_news_many(conn, items, fetched_at, batch_size)
+                    # 新寫入的那幾則標記成員，並跟近幾天的新聞比對是不是同一則的改寫
+                    tag_news_since(conn, since_id)
+                    cluster_news_since(conn, since_id)
+                    for url, r in changed.items():
+                        save_feed_state(conn, url, r["state"])
+                db_write_ms = _ms(write_started)
+
+            # 3. 記錄這次抓取的數據
+            summary = metrics.summarize(started_at, time.perf_counter() - started, results,
+                                        stored, db_write_ms, db_size())
+            with conn:
+                save_run_summary(conn, summary)
+        metrics.log_feeds(feeds, results)
+        metrics.log_json("run", **summary)
+        metrics.write_prometheus(summary)
+
+        print(f"任務完成：{len(feeds)} 個來源 "
+              f"(更新 {counts.get('ok', 0)}、304 {counts.get('not_modified', 0)}、"
+              f"內容相同 {counts.get('unchanged', 0)}、失敗 {counts.get('error', 0)})，"
+              f"新增 {stored} 則，耗時 {time.perf_counter() - started:.1f} 秒。")
+        return results
     except Exception as e:
         print(f"發生錯誤：{e}")
+        metrics.log_json("run_failed", started_at=started_at, error=str(e))
+        return None
+
+
+# ==========================================
+# 🚀 指令列 (Command Line)
+# ==========================================
+def _locked(job, *args, **kwargs):
+    """fetch / ingest 跟 serve 共用同一把執行鎖 (idle_data.db.lock)，同一時間只會有一個抓取任務"""
+    from scheduler import AlreadyRunning, run_lock
+    try:
+        with run_lock():
+            return job(*args, **kwargs)
+    except AlreadyRunning as e:
+        print(f"{e}，這次不抓取。")
+        raise SystemExit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="i-dle 新聞自動抓取")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("fetch", help="抓取一次就結束 (預設，GitHub Action 用這個)")
+    serve_parser = commands.add_parser("serve", help="常駐排程，依每個來源的間隔持續抓取")
+    serve_parser.add_argument("--interval", type=float, help="每個來源幾分鐘抓一次 (預設看 scheduler.DEFAULT_INTERVAL)")
+    commands.add_parser("export", help="把還沒匯出的新聞寫成 exports/ 底下的壓縮分區檔")
+    load_parser = commands.add_parser("load", help="從 exports/ 的分區檔載入資料庫 (只載入新的檔案)")
+    load_parser.add_argument("--rebuild", action="store_true", help="先刪掉資料庫 (連同封存資料庫)，完全重建")
+    enrich_parser = commands.add_parser("enrich", help="補抓新文章的摘要與內文 (獨立於抓取任務)")
+    enrich_parser.add_argument("--limit", type=int, help="這次最多處理幾則")
+    enrich_parser.add_argument("--watch", action="store_true", help="常駐執行，佇列空了就等一下再看")
+    ingest_parser = commands.add_parser("ingest", help="多行程抓取：多個行程抓取解析，一個行程負責寫入")
+    ingest_parser.add_argument("--processes", type=int, help="抓取行程數 (預設 CPU 核心數)")
+    backfill_parser = commands.add_parser("backfill", help="回補一段日期的歷史新聞 (可中斷，下次接著跑)")
+    backfill_parser.add_argument("--since", type=date.fromisoformat, required=True, help="開始日期 YYYY-MM-DD")
+    backfill_parser.add_argument("--until", type=date.fromisoformat, help="結束日期 YYYY-MM-DD (不含，預設到今天)")
+    backfill_parser.add_argument("--window-days", type=int, help="每個搜尋區間幾天 (預設看 backfill.WINDOW_DAYS)")
+    backfill_parser.add_argument("--workers", type=int, help="同時幾個請求")
+    backfill_parser.add_argument("--rate", type=float, help="全部加起來每秒最多幾個請求")
+    backfill_parser.add_argument("--query", action="append", help="只回補這些關鍵字 (可重複，預設全部)")
+    backfill_parser.add_argument("--locale", action="append", choices=list(LOCALES), help="只回補這些語系")
+    retention_parser = commands.add_parser("retention", help="把舊新聞搬到封存資料庫，再整理主資料庫 (VACUUM / ANALYZE)")
+    retention_parser.add_argument("--days", type=int, help="主資料庫保留最近幾天 (預設看 storage.HOT_DAYS)")
+    retention_parser.add_argument("--no-vacuum", action="store_true", help="只搬資料，不整理主資料庫")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        import scheduler
+        scheduler.serve(interval=args.interval * 60 if args.interval else None)
+    elif args.command == "export":
+        import export
+        with connection() as conn:
+            written = export.export_new(conn)
+        print(f"匯出完成：{len(written)} 個檔案。" + "".join(f"\n  {path}" for path in written))
+    elif args.command == "load":
+        import export
+        if args.rebuild:
+            files, added = export.rebuild()
+        else:
+            with connection() as conn:
+                files, added = export.load_exports(conn)
+        print(f"載入完成：{files} 個檔案，新增 {added} 則。")
+    elif args.command == "ingest":
+        import ingest
+        _locked(ingest.ingest, processes=args.processes or ingest.PROCESSES)
+    elif args.command == "backfill":
+        import backfill
+        backfill.backfill(args.since, args.until, args.window_days or backfill.WINDOW_DAYS, args.query, args.locale,
+                          args.workers or backfill.MAX_WORKERS, args.rate or backfill.RATE)
+    elif args.command == "retention":
+        import retention
+        retention.retention(args.days or retention.HOT_DAYS, vacuum=not args.no_vacuum)
+    elif args.command == "enrich":
+        import enrich
+        if args.watch:
+            enrich.serve()
+        else:
+            counts = enrich.run(args.limit)
+            print(f"補抓完成 {counts['done']} 則，稍後重試 {counts['retry']} 則，放棄 {counts['failed']} 則。")
+    else:
+        _locked(fetch_job)
+
+
+if __name__ == "__main__":
+    main()
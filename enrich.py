@@ -0,0 +1,210 @@
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+import lxml.html
+import requests
+from lxml import etree
+
+import metrics
+from database import REQUEST_TIMEOUT, make_session
+from scheduler import AlreadyRunning, run_lock
+from storage import DB_PATH, claim_enrich_jobs, close_all, connection, save_enrichment, to_db_time
+
+# ==========================================
+# ⚙️ 內文補抓設定 (Enrichment Configuration)
+# ==========================================
+# 抓取任務只寫標題；文章網頁由這個獨立的 worker 慢慢補，不會拖慢抓新聞
+BATCH_SIZE = 32            # 每一輪從佇列取幾則 (也是記憶體裡最多同時處理的數量)
+MAX_WORKERS = 8
+DOMAIN_INTERVAL = 1.0      # 同一個網站兩次請求至少間隔幾秒
+MAX_ATTEMPTS = 4           # 暫時性的錯誤最多試幾次
+RETRY_DELAY = 5 * 60       # 第一次重試等幾秒，之後每次加倍
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+EXCERPT_CHARS = 500
+IDLE_SLEEP = 60            # --watch 模式佇列空了之後等多久再看
+LOCK_PATH = DB_PATH + ".enrich.lock"
+
+# 這些狀態碼代表「等一下再試可能就好了」，其他 4xx 直接放棄
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+# 不是內文的區塊，抽文字前先整個拿掉
+_BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "figure"]
+
+
+class RetryLater(Exception):
+    pass
+
+
+# ==========================================
+# 🚦 每個網站的速率限制 (Per-domain Rate Limit)
+# ==========================================
+class DomainLimiter:
+    """同一個網站的請求至少間隔 interval 秒；每個執行緒先預約時段再睡，不會一起衝出去"""
+
+    def __init__(self, interval=DOMAIN_INTERVAL):
+        self.interval = interval
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# ==========================================
+# 📄 內文擷取 (Extraction)
+# ==========================================
+def _clean(text):
+    return " ".join((text or "").split())
+
+
+def extract(content, url=None):
+    """從文章 HTML 取出 (description, excerpt)
+
+    description 取 <meta name="description"> 或 og:description；
+    excerpt 是去掉導覽列、頁尾、script 之後，前面幾段 <p> 的文字 (最多 EXCERPT_CHARS 個字)。
+    """
+    try:
+        doc = lxml.html.document_fromstring(content, base_url=url)
+    except (etree.ParserError, ValueError):
+        return None, None
+
+    description = None
+    for xpath in ('//meta[@name="description"]/@content', '//meta[@property="og:description"]/@content'):
+        found = doc.xpath(xpath)
+        if found and _clean(found[0]):
+            description = _clean(found[0])
+            break
+
+    etree.strip_elements(doc, *_BOILERPLATE_TAGS, with_tail=False)
+    parts, length = [], 0
+    for p in doc.iter("p"):
+        text = _clean(p.text_content())
+        # 太短的通常是按鈕、圖說或版權宣告
+        if len(text) < 40:
+            continue
+        parts.append(text)
+        length += len(text) + 1
+        if length >= EXCERPT_CHARS:
+            break
+    excerpt = " ".join(parts)[:EXCERPT_CHARS] or None
+    return description, excerpt
+
+
+# ==========================================
+# 🌐 抓文章 (Fetch)
+# ==========================================
+def _is_google(url):
+    host = urlparse(url).netloc
+    return host == "google.com" or host.endswith(".google.com")
+
+
+def fetch_page(session, limiter, url):
+    """抓一篇文章，回傳 (最後的網址, description, excerpt)
+
+    Google News 的連結不會排進佇列 (storage v18，改用 RSS 的摘要)；還是碰到、或最後停在 Google 的頁面
+    (轉址頁、同意頁) 的直接丟 ValueError，不把 Google 的頁面當成文章存下來。
+    暫時性的錯誤 (逾時、連線失敗、429、5xx) 丟 RetryLater；其他錯誤直接往外丟。
+    """
+    if _is_google(url):
+        raise ValueError("Google News 的連結沒有原文網址")
+    limiter.wait(url)
+    try:
+        with session.get(url, timeout=REQUEST_TIMEOUT, stream=True) as response:
+            if response.status_code in RETRY_STATUSES:
+                raise RetryLater(f"HTTP {response.status_code}")
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "")
+            if "html" not in content_type:
+                return response.url, None, None
+            # 只讀前 MAX_PAGE_BYTES，超大的頁面不整個讀進記憶體
+            chunks, size = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= MAX_PAGE_BYTES:
+                    break
+            content = b"".join(chunks)
+            final_url = response.url
+    except (requests.ConnectionError, requests.Timeout) as e:
+        raise RetryLater(type(e).__name__)
+    if _is_google(final_url):
+        raise ValueError(f"停在 Google 的頁面，不是原文：{urlparse(final_url).netloc}")
+    return (final_url, *extract(content, final_url))
+
+
+def _retry_at(attempts):
+    delay = RETRY_DELAY * (2 ** attempts)
+    return to_db_time(datetime.now(timezone.utc) + timedelta(seconds=delay))
+
+
+def enrich_batch(session, limiter, jobs, max_workers=MAX_WORKERS):
+    """並行抓一批文章，回傳 (done, retry, failed)，格式對應 storage.save_enrichment"""
+    done, retry, failed = [], [], []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_page, session, limiter, link): (news_id, attempts)
+                   for news_id, link, attempts in jobs}
+        for future in as_completed(futures):
+            news_id, attempts = futures[future]
+            try:
+                done.append((news_id, *future.result()))
+            except RetryLater as e:
+                if attempts + 1 >= MAX_ATTEMPTS:
+                    failed.append((news_id, str(e)))
+                else:
+                    retry.append((news_id, _retry_at(attempts), str(e)))
+            except Exception as e:
+                failed.append((news_id, f"{type(e).__name__}: {e}"[:200]))
+    return done, retry, failed
+
+
+def run(limit=None, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    """把佇列裡到期的工作做完 (或做滿 limit 則)，回傳 {"done", "retry", "failed"} 的數量
+
+    同一時間只會有一個 worker 在取工作；另一個還在跑時丟 AlreadyRunning。
+    每一批在記憶體裡最多 batch_size 則，抓完在一個 transaction 裡寫回。
+    """
+    counts = {"done": 0, "retry": 0, "failed": 0}
+    limiter = DomainLimiter()
+    with run_lock(LOCK_PATH), make_session(max_workers) as session, connection() as conn:
+        while limit is None or sum(counts.values()) < limit:
+            size = batch_size if limit is None else min(batch_size, limit - sum(counts.values()))
+            jobs = claim_enrich_jobs(conn, size, to_db_time(datetime.now(timezone.utc)))
+            if not jobs:
+                break
+            done, retry, failed = enrich_batch(session, limiter, jobs, max_workers)
+            with conn:
+                save_enrichment(conn, done, retry, failed, to_db_time(datetime.now(timezone.utc)))
+            counts["done"] += len(done)
+            counts["retry"] += len(retry)
+            counts["failed"] += len(failed)
+    metrics.log_json("enrich", **counts)
+    return counts
+
+
+def serve(stop=None, idle_sleep=IDLE_SLEEP):
+    """常駐執行：佇列有工作就做，空了就等 idle_sleep 秒再看，直到收到 SIGINT / SIGTERM"""
+    stop = stop or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+    while not stop.is_set():
+        try:
+            counts = run()
+        except AlreadyRunning as e:
+            print(f"{e}，{idle_sleep} 秒後再試。")
+        else:
+            if any(counts.values()):
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 補抓完成 {counts['done']} 則，"
+                      f"稍後重試 {counts['retry']} 則，放棄 {counts['failed']} 則。")
+        stop.wait(idle_sleep)
+    close_all()
@@ -0,0 +1,128 @@
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from storage import (ARCHIVE_PATH, DB_PATH, HOT_DAYS, archive_attached, archive_expired, begin_news_write, close_all,
+                     cluster_news_since, connection, expired_news_ids, tag_news_since, to_db_time)
+
+# ==========================================
+# 📦 匯出設定 (Export Configuration)
+# ==========================================
+# 取代把整個 idle_data.db 提交進 git：每次抓取只把「新增的新聞」寫成一個壓縮檔，
+# 依日期分資料夾 (exports/2026/10/18/...)，舊檔案永遠不改，所以每次提交只多出這次的量。
+EXPORT_DIR = "exports"
+EXPORT_COLUMNS = ["name", "news", "item_key", "pub_date", "link", "source", "member", "fetched_at",
+                  "summary"]
+UNDATED = "undated"  # 舊資料沒有 fetched_at，放在這個資料夾
+
+
+def _partition(fetched_at):
+    if not fetched_at:
+        return UNDATED
+    return f"{fetched_at[:4]}/{fetched_at[5:7]}/{fetched_at[8:10]}"
+
+
+def _fs_path(export_dir, relpath):
+    # 資料庫裡一律記 "/" 分隔的相對路徑，Windows 上也一樣
+    return os.path.join(export_dir, *relpath.split("/"))
+
+
+def _write_partition(path, rows):
+    """寫成 NDJSON.gz；先寫暫存檔再改名，中途當掉也不會留下半個檔案"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as raw:
+        # mtime=0：同樣的內容壓出來的檔案一模一樣，git 才不會當成變更
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+            for row in rows:
+                gz.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False).encode("utf-8") + b"\n")
+    os.replace(tmp, path)
+
+
+def export_new(conn, export_dir=EXPORT_DIR):
+    """把還沒匯出的新聞寫成新的分區檔，回傳寫出的檔案清單"""
+    rows = conn.execute(
+        f"SELECT id, {', '.join(EXPORT_COLUMNS)} FROM members WHERE exported_in IS NULL ORDER BY id"
+    ).fetchall()
+    if not rows:
+        return []
+
+    by_partition = {}
+    for row in rows:
+        by_partition.setdefault(_partition(row[EXPORT_COLUMNS.index("fetched_at") + 1]), []).append(row)
+
+    # 檔名帶時間與亂數，就算本機排程和 GitHub Action 同時匯出也不會撞名
+    run_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{uuid.uuid4().hex[:6]}"
+    written = []
+    for partition, part_rows in sorted(by_partition.items()):
+        relpath = f"{partition}/{run_id}.ndjson.gz"
+        _write_partition(_fs_path(export_dir, relpath), (row[1:] for row in part_rows))
+        with conn:
+            conn.executemany("UPDATE members SET exported_in = ? WHERE id = ?",
+                             [(relpath, row[0]) for row in part_rows])
+            # 自己寫出來的檔案不需要再載入
+            _mark_loaded(conn, relpath, len(part_rows))
+        written.append(relpath)
+    return written
+
+
+def _mark_loaded(conn, relpath, rows):
+    conn.execute("INSERT OR REPLACE INTO export_files (path, rows, loaded_at) VALUES (?, ?, ?)",
+                 (relpath, rows, datetime.now().isoformat(timespec="seconds")))
+
+
+def _partition_files(export_dir):
+    for root, _, files in os.walk(export_dir):
+        for name in files:
+            if name.endswith(".ndjson.gz"):
+                yield os.path.relpath(os.path.join(root, name), export_dir).replace(os.sep, "/")
+
+
+def load_exports(conn, export_dir=EXPORT_DIR, hot_days=HOT_DAYS, archive_path=None):
+    """把還沒載入過的分區檔寫進資料庫 (增量)；回傳 (載入檔案數, 新增筆數)
+
+    跟 retention 一樣只在主資料庫留最近 hot_days 天：每個檔案載入後，超過的馬上搬到封存資料庫，
+    從頭重建時主資料庫也不會先長到整個歷史那麼大。平常載入的都是新檔案，沒有要搬的就不會開封存。
+    """
+    loaded = {path for (path,) in conn.execute("SELECT path FROM export_files")}
+    pending = sorted(p for p in _partition_files(export_dir) if p not in loaded)
+    columns = EXPORT_COLUMNS + ["exported_in"]
+    sql = (f"INSERT INTO members ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+           f"ON CONFLICT (item_key) DO NOTHING")
+    now = datetime.now(timezone.utc)
+    cutoff = to_db_time(now - timedelta(days=hot_days)) if hot_days else None
+
+    files = added = 0
+    for relpath in pending:
+        with gzip.open(_fs_path(export_dir, relpath), "rt", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        with conn:
+            since_id = begin_news_write(conn)
+            cursor = conn.executemany(sql, [[r.get(c) for c in EXPORT_COLUMNS] + [relpath] for r in rows])
+            tag_news_since(conn, since_id)
+            cluster_news_since(conn, since_id)
+            _mark_loaded(conn, relpath, len(rows))
+        files += 1
+        added += cursor.rowcount
+        if cutoff and expired_news_ids(conn, cutoff, 1):
+            with archive_attached(conn, archive_path, readonly=False):
+                archive_expired(conn, cutoff, to_db_time(now))
+    return files, added
+
+
+def rebuild(db_path=DB_PATH, export_dir=EXPORT_DIR, hot_days=HOT_DAYS, archive_path=None):
+    """刪掉資料庫 (連同封存資料庫)，完全從匯出檔重建
+
+    封存的新聞都已經匯出過，會在載入時重新搬過去；留著舊的封存檔的話，
+    新編的 id 會跟裡面的撞在一起。
+    """
+    archive_path = archive_path or ARCHIVE_PATH
+    close_all()
+    for path, suffixes in ((db_path, ("", "-wal", "-shm")), (archive_path, ("", "-journal"))):
+        for suffix in suffixes:
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    with connection(db_path) as conn:
+        return load_exports(conn, export_dir, hot_days, archive_path)
@@ -0,0 +1 @@
+# 網站的各個頁面 (idle_website.py 依側邊欄選擇延遲載入)
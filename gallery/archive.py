@@ -0,0 +1,55 @@
+import streamlit as st
+
+from gallery.theme import colors
+
+
+# ----------------------------------------------------
+# B. i-archive: The Collection (典藏作品)
+# ----------------------------------------------------
+def render():
+    """各時期的作品"""
+    st.markdown(f"""
+    <div style="margin-bottom: 30px;">
+        <h1 style="font-size: 4rem; margin-bottom: 0; color: {colors['accent_primary']}">The Collection</h1>
+        <div class="handwriting" style="font-size: 2rem;">Discography & Works</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # 使用 Tabs 區分時期 (Eras)
+    tab1, tab2, tab3 = st.tabs(["2 (2024)", "I feel (2023)", "I NEVER DIE (2022)"])
+    
+    with tab1:
+        c1, c2 = st.columns([1, 2])
+        with c1:
+            # 這裡可以使用 st.image 放專輯封面
+            st.markdown(f"""
+            <div style="background-color: white; padding: 20px; border-radius: 12px; box-shadow: 0 10px 20px rgba(0,0,0,0.05);">
+                <div style="aspect-ratio: 1/1; background-color: #ddd; display: flex; align-items: center; justify-content: center; border-radius: 8px; margin-bottom: 15px;">
+                    <span style="color: #888;">Album Cover Placeholder</span>
+                </div>
+                <h3 style="margin: 0;">2</h3>
+                <p style="color: {colors['text_sub']}; font-size: 0.9rem;">The 2nd Full Album</p>
+            </div>
+            """, unsafe_allow_html=True)
+        with c2:
+            st.markdown("### Title Track: Super Lady")
+            # 模擬播放器樣式
+            st.markdown(f"""
+            <div style="padding: 20px; background: white; border-radius: 12px; border-left: 4px solid {colors['accent_primary']};">
+                <p style="font-family: 'Playfair Display'; font-style: italic; font-size: 1.2rem;">"I am the top, super lady..."</p>
+                <div style="margin-top: 10px; height: 4px; background: #eee; border-radius: 2px;">
+                    <div style="width: 40%; height: 100%; background: {colors['accent_primary']}; border-radius: 2px;"></div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            with st.expander("View Full Tracklist", expanded=True):
+                st.markdown("""
+                1. **Super Lady**
+                2. Revenge
+                3. Doll
+                4. Vision
+                """)
+
+    with tab2:
+        st.info("Archive data for [I feel] era is currently being curated.")
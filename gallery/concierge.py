@@ -0,0 +1,102 @@
+import functools
+import html
+import uuid
+
+import streamlit as st
+
+from gallery.data import GUESTBOOK_PAGE_SIZE, current_guestbook_version, get_guestbook, guestbook_writer
+from gallery.theme import colors
+from guestbook import MAX_MESSAGE_CHARS, GuestbookBusy, RateLimited
+
+
+# ----------------------------------------------------
+# D. i-concierge: Curator's Guide (策展人指引)
+# ----------------------------------------------------
+# 定義卡片樣式函數 (內容固定，每張卡片只組一次)
+@functools.lru_cache(maxsize=None)
+def resource_card(title, sub, icon):
+    return f"""
+    <div style="background: white; padding: 30px; border-radius: 16px; text-align: center; border-bottom: 4px solid {colors['accent_secondary']}; transition: transform 0.3s;">
+        <div style="font-size: 3rem; margin-bottom: 10px;">{icon}</div>
+        <h3 style="margin: 10px 0;">{title}</h3>
+        <p style="color: {colors['text_sub']}; font-size: 0.9rem;">{sub}</p>
+    </div>
+    """
+
+
+def render():
+    """相關連結與留言板"""
+    st.markdown(f"""
+    <div style="margin-bottom: 30px;">
+        <h1 style="font-size: 4rem; margin-bottom: 0; color: {colors['accent_primary']}">Curator's Guide</h1>
+        <div class="handwriting" style="font-size: 2rem;">Resources & Links</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    c1, c2, c3 = st.columns(3)
+    
+    with c1:
+        st.markdown(resource_card("Official", "YouTube / X / Instagram", "🌐"), unsafe_allow_html=True)
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.button("VISIT OFFICIAL SITE", use_container_width=True)
+        
+    with c2:
+        st.markdown(resource_card("Ticketing", "World Tour [i-DOL]", "🎫"), unsafe_allow_html=True)
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.button("VIEW TOUR DATES", use_container_width=True)
+        
+    with c3:
+        st.markdown(resource_card("Fanclub", "NEVERLAND Membership", "💜"), unsafe_allow_html=True)
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.button("JOIN MEMBERSHIP", use_container_width=True)
+
+    # 底部聯絡表單
+    st.markdown("---")
+    st.markdown("### Guestbook")
+    guestbook()
+
+
+@st.fragment
+def guestbook():
+    """送出留言時只重跑留言板"""
+    if "guestbook_session" not in st.session_state:
+        st.session_state.guestbook_session = uuid.uuid4().hex
+        st.session_state.guestbook_page = 0
+
+    with st.form("guestbook", clear_on_submit=True):
+        message = st.text_area("Leave a message for the gallery:", placeholder="Write something...",
+                               max_chars=MAX_MESSAGE_CHARS)
+        submitted = st.form_submit_button("SIGN GUESTBOOK")
+        if submitted:
+            try:
+                guestbook_writer().submit(message, st.session_state.guestbook_session)
+            except ValueError:
+                st.warning("Please write something first.")
+            except (RateLimited, GuestbookBusy) as e:
+                st.warning(str(e))
+            else:
+                # 留言在佇列裡，最多 FLUSH_MS 毫秒後才會出現在下面的列表
+                st.success("Your message has been recorded in the gallery archives.")
+
+    # 最新留言 (分頁)
+    page = st.session_state.guestbook_page
+    entries = get_guestbook(page, current_guestbook_version())
+    if entries:
+        st.markdown("".join(f"""
+        <div style="padding: 12px 0; border-bottom: 1px solid rgba(74, 44, 44, 0.1);">
+            <div>{html.escape(entry["message"])}</div>
+            <div style="font-size: 0.75rem; color: {colors['text_sub']}; margin-top: 4px;">{entry["created_at"]}</div>
+        </div>
+        """ for entry in entries), unsafe_allow_html=True)
+    elif page == 0:
+        st.caption("No messages yet. Be the first to sign the guestbook.")
+
+    newer, older = st.columns(2)
+    if page > 0:
+        newer.button("NEWER", on_click=_turn_page, args=(-1,), use_container_width=True)
+    if len(entries) == GUESTBOOK_PAGE_SIZE:
+        older.button("OLDER", on_click=_turn_page, args=(1,), use_container_width=True)
+
+
+def _turn_page(step):
+    st.session_state.guestbook_page = max(0, st.session_state.guestbook_page + step)
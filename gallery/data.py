@@ -0,0 +1,111 @@
+import html
+import re
+
+import streamlit as st
+
+from export import load_exports
+from guestbook import GuestbookWriter
+from storage import (connection, daily_member_counts, guestbook_version, latest_stories, member_news, news_version,
+                     recent_guestbook, search_stories, top_sources)
+
+NEWS_PAGE_SIZE = 20   # Gallery Intelligence 每頁幾則
+NEWS_CACHE_TTL = 300  # 秒；資料庫沒變動時最多快取這麼久
+GUESTBOOK_PAGE_SIZE = 10
+
+# ==========================================
+# 🗄️ 資料庫存取函式 (Database Access Functions)
+@st.cache_resource(show_spinner=False)
+def load_archive():
+    """資料庫不進 git，每個行程啟動時先把 exports/ 裡還沒載入的分區檔補進來"""
+    try:
+        with connection() as conn:
+            return load_exports(conn)
+    except Exception as e:
+        return (0, 0)
+
+
+def current_news_version():
+    """新聞快取 key 的一部分 (storage.news_version)：抓到新的新聞，快取就自動失效；讀不到時只靠 TTL"""
+    try:
+        with connection() as conn:
+            return news_version(conn)
+    except Exception as e:
+        return None
+
+
+def current_guestbook_version():
+    """留言列表快取 key 的一部分：留言的佇列寫入後才會變，不會連帶讓新聞快取失效"""
+    try:
+        with connection() as conn:
+            return guestbook_version(conn)
+    except Exception as e:
+        return None
+
+
+@st.cache_data(ttl=NEWS_CACHE_TTL, show_spinner=False)
+def get_member_news(limit=NEWS_PAGE_SIZE, offset=0, version=None):
+    # version 只是快取 key，不會用到
+    try:
+        # 共用連線池，表格在第一次連線時就建好了
+        with connection() as conn:
+            # 只撈畫面上要顯示的那一頁；同一則新聞被多家媒體改寫的只算一則
+            return [dict(row) for row in latest_stories(conn, limit, offset)]
+    except Exception as e:
+        return []
+
+
+@st.cache_data(ttl=NEWS_CACHE_TTL, show_spinner=False)
+def get_muse_news(member, limit=3, version=None):
+    """策展人卡片用：標題提到這位成員的最新幾則 (走 news_members 索引)"""
+    try:
+        with connection() as conn:
+            return [dict(row) for row in member_news(conn, member, limit)]
+    except Exception as e:
+        return []
+
+
+@st.cache_data(ttl=NEWS_CACHE_TTL, show_spinner=False)
+def search_member_news(text, limit=NEWS_PAGE_SIZE, version=None):
+    try:
+        with connection() as conn:
+            return search_stories(conn, text, limit)
+    except Exception as e:
+        return []
+
+
+@st.cache_data(ttl=NEWS_CACHE_TTL, show_spinner=False)
+def get_news_activity(since, until, version=None):
+    """趨勢圖資料：直接讀預先累計好的 news_daily，只讀顯示範圍內的那幾天"""
+    try:
+        with connection() as conn:
+            daily = [dict(row) for row in daily_member_counts(conn, since, until)]
+            sources = [dict(row) for row in top_sources(conn, since, until)]
+        return daily, sources
+    except Exception as e:
+        return [], []
+
+
+@st.cache_resource(show_spinner=False)
+def guestbook_writer():
+    """整個行程共用一個 write-behind 佇列 (所有訪客的留言一起分批寫入)"""
+    return GuestbookWriter()
+
+
+@st.cache_data(ttl=NEWS_CACHE_TTL, show_spinner=False)
+def get_guestbook(page=0, version=None):
+    """最新留言的第 page 頁；WAL 模式下讀取不會擋住正在寫入的佇列"""
+    try:
+        with connection() as conn:
+            return [dict(row) for row in recent_guestbook(conn, GUESTBOOK_PAGE_SIZE, page * GUESTBOOK_PAGE_SIZE)]
+    except Exception as e:
+        return []
+
+
+def highlight(text, terms):
+    """先做 HTML escape，再把搜尋詞包上 <mark>"""
+    escaped = html.escape(text)
+    if not terms:
+        return escaped
+    pattern = re.compile("|".join(re.escape(html.escape(t)) for t in sorted(terms, key=len, reverse=True)),
+                         re.IGNORECASE)
+    return pattern.sub(lambda m: f"<mark>{m.group(0)}</mark>", escaped)
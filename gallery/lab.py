@@ -0,0 +1,184 @@
+import datetime
+import html
+
+# pandas / plotly 很重，只有這一頁用得到：第一次打開 i-lab 才會載入 (之後留在 sys.modules)
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from gallery.data import (NEWS_CACHE_TTL, NEWS_PAGE_SIZE, current_news_version, get_member_news, get_news_activity,
+                          highlight, search_member_news)
+from gallery.theme import colors
+from storage import search_terms
+
+
+# ----------------------------------------------------
+# C. i-lab: Perspectives (觀點與分析)
+# ----------------------------------------------------
+def render():
+    """圖表、新聞趨勢與 Gallery Intelligence"""
+    st.markdown(f"""
+    <div style="margin-bottom: 30px;">
+        <h1 style="font-size: 4rem; margin-bottom: 0; color: {colors['accent_primary']}">Perspectives</h1>
+        <div class="handwriting" style="font-size: 2rem;">Analysis & Insights</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    c1, c2 = st.columns([1.5, 1])
+    
+    with c1:
+        # 雷達圖邏輯 (Radar Chart)
+        st.markdown("### Member Attributes")
+        # 假資料
+        df = pd.DataFrame(dict(
+            r=[90, 85, 80, 95, 88],
+            theta=['Vocal', 'Rap', 'Dance', 'Producing', 'Visual']
+        ))
+        
+        # 使用 Plotly 畫圖，並配合你的配色
+        fig = px.line_polar(df, r='r', theta='theta', line_close=True)
+        fig.update_traces(fill='toself', line_color=colors['accent_primary'])
+        fig.update_layout(
+            polar=dict(
+                radialaxis=dict(visible=True, showticklabels=False),
+                bgcolor='rgba(0,0,0,0)' # 透明背景
+            ),
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="DM Sans", color=colors['text_main']),
+            margin=dict(l=20, r=20, t=20, b=20)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+    with c2:
+        # 文字分析
+        st.markdown(f"""
+        <div style="background-color: white; padding: 30px; border-radius: 16px; height: 100%;">
+            <h4 style="font-family: 'Playfair Display'; color: {colors['accent_secondary']};">Curator's Insight</h4>
+            <p style="line-height: 1.8; text-align: justify;">
+                (G)I-DLE 的獨特之處在於成員們高度的<b>「自製能力 (Self-Producing)」</b>。
+                雷達圖顯示，除了傳統偶像的能力值外，她們在創作與概念構建上展現了極高的數值。
+            </p>
+            <hr>
+            <div style="font-size: 3rem; font-family: 'Playfair Display'; color: {colors['accent_primary']};">95%</div>
+            <div style="font-size: 0.8rem; text-transform: uppercase; letter-spacing: 1px;">Creative Participation</div>
+        </div>
+        """, unsafe_allow_html=True)
+        
+    st.markdown("---") # 加一條分隔線
+    st.markdown("### 📈 News Activity")
+    news_activity()
+
+    st.markdown("---")
+    st.markdown("### 🏛️ Gallery Intelligence (資料庫即時情報)")
+    gallery_intelligence()
+
+
+@st.fragment
+def news_activity():
+    """換時間範圍時只重畫趨勢圖"""
+    activity_ranges = {"7 Days": 7, "30 Days": 30, "90 Days": 90, "1 Year": 365}
+    activity_range = st.radio("Range", list(activity_ranges), index=1, horizontal=True, label_visibility="collapsed")
+    until = datetime.date.today()
+    since = until - datetime.timedelta(days=activity_ranges[activity_range] - 1)
+    daily, sources = get_news_activity(since, until, current_news_version())
+
+    if daily:
+        a1, a2 = st.columns([1.5, 1])
+        chart_layout = dict(
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="DM Sans", color=colors['text_main']),
+            margin=dict(l=20, r=20, t=20, b=20)
+        )
+        with a1:
+            # 每位成員每天的新聞數 (member 為空的是全部新聞)
+            df_daily = pd.DataFrame(daily)
+            df_daily["member"] = df_daily["member"].replace("", "All Headlines")
+            fig = px.line(df_daily, x="day", y="headlines", color="member", markers=True,
+                          color_discrete_sequence=[colors['accent_primary'], colors['accent_secondary'],
+                                                   "#FF9A9E", colors['text_sub'], colors['text_main'], "#C9A0DC"])
+            fig.update_layout(**chart_layout, legend_title_text="", xaxis_title="", yaxis_title="Headlines")
+            st.plotly_chart(fig, use_container_width=True)
+        with a2:
+            # 報導最多的媒體
+            if sources:
+                df_sources = pd.DataFrame(sources)
+                fig = px.bar(df_sources, x="headlines", y="source", orientation="h")
+                fig.update_traces(marker_color=colors['accent_secondary'])
+                fig.update_layout(**chart_layout, xaxis_title="Headlines", yaxis_title="",
+                                  yaxis=dict(autorange="reversed"))
+                st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.write("這段期間還沒有新聞。")
+
+
+def news_card(row, terms):
+    outlets = f"{row['outlets']} outlets" if row.get("outlets", 1) > 1 else None
+    archived = "archived" if row.get("archived") else None
+    meta = " · ".join(v for v in (row["source"], row["pub_date"], outlets, archived) if v)
+    # 補抓到文章內容的，多顯示一小段預覽；搜尋詞只出現在內文時改顯示內文
+    summary = row.get("description") or row.get("excerpt")
+    if terms and row.get("excerpt") and not any(t.lower() in (summary or "").lower() for t in terms):
+        summary = row["excerpt"]
+    preview = ""
+    if summary:
+        summary = summary if len(summary) <= 160 else summary[:160] + "…"
+        preview = f'<div style="font-size: 0.85rem; color: {colors["text_sub"]}; margin-top: 6px;">{highlight(summary, terms)}</div>'
+
+    return f"""
+    <div style="background: white; padding: 20px; border-radius: 12px; margin-bottom: 10px; border-left: 5px solid {colors['accent_secondary']}; shadow: 0 4px 6px rgba(0,0,0,0.05);">
+        <strong style="color: {colors['accent_primary']};">{html.escape(row["member"] or row["name"])}</strong>: {highlight(row["news"], terms)}
+        {preview}<div style="font-size: 0.75rem; color: {colors['text_sub']}; margin-top: 5px;">{html.escape(meta)}</div>
+    </div>
+    """
+
+
+# 每一頁 / 每個搜尋的卡片 HTML 也快取起來：其他訪客看同一頁時不用再組一次
+@st.cache_data(ttl=NEWS_CACHE_TTL, show_spinner=False)
+def news_page_html(page, version=None):
+    """回傳 (HTML, 這一頁幾則)"""
+    rows = get_member_news(NEWS_PAGE_SIZE, page * NEWS_PAGE_SIZE, version)
+    return "".join(news_card(row, []) for row in rows), len(rows)
+
+
+@st.cache_data(ttl=NEWS_CACHE_TTL, show_spinner=False)
+def search_html(query, version=None):
+    """回傳 (HTML, 找到幾則)"""
+    terms = search_terms(query)
+    rows = search_member_news(query, NEWS_PAGE_SIZE, version)
+    return "".join(news_card(row, terms) for row in rows), len(rows)
+
+
+@st.fragment
+def gallery_intelligence():
+    """搜尋與「載入更多」只重跑新聞列表"""
+    version = current_news_version()
+    query = st.text_input("Search the archive", placeholder="e.g. Soyeon tour", label_visibility="collapsed")
+
+    if search_terms(query):
+        # 全文搜尋 (FTS5)，依相關度排序
+        cards, found = search_html(query, version)
+        if found:
+            st.markdown(cards, unsafe_allow_html=True)
+        else:
+            st.write("找不到符合的消息。")
+        return
+
+    # 每一頁各自快取，按「載入更多」只會多查新的那一頁
+    if "news_pages" not in st.session_state:
+        st.session_state.news_pages = 1
+    pages = [news_page_html(page, version) for page in range(st.session_state.news_pages)]
+    if not pages[0][1]:
+        st.write("目前冰箱裡還沒有消息，快去存入一筆吧！")
+        return
+
+    # 用你的藝廊風格展示 (整頁合成一個 HTML 區塊送出)
+    st.markdown("".join(cards for cards, _ in pages), unsafe_allow_html=True)
+
+    # 最後一頁是滿的，代表後面可能還有；callback 在 fragment 重跑前就先加頁數，不用再 st.rerun()
+    if pages[-1][1] == NEWS_PAGE_SIZE:
+        st.button("LOAD MORE", on_click=_load_more)
+
+
+def _load_more():
+    st.session_state.news_pages += 1
@@ -0,0 +1,196 @@
+# ==========================================
+# 🎨 核心風格 (The Romantic Gallery Visuals)
+# ==========================================
+# 色票與 CSS 在模組載入時建好一次，之後每次 rerun 直接沿用同一個字串，不用重組整段 f-string
+
+# 定義色票 (Color Palette: Romantic Gallery)
+colors = {
+    "bg": "#FFF5F5",             # Blush White (畫布底色)
+    "accent_primary": "#D92E46", # Velvet Rose (絲絨玫瑰紅)
+    "accent_secondary": "#9D7AAE", # Dusty Lilac (煙燻紫丁香)
+    "text_main": "#4A2C2C",      # Warm Cocoa (暖可可深褐)
+    "text_sub": "#9E9085",       # Warm Greige (暖灰褐)
+    "quote_bg": "#FFF0F5",       # Pale Lavender Blush (語錄框底色)
+    "white": "#FFFFFF"
+}
+
+custom_css = f"""
+<style>
+    /* 引入字體：
+       - Playfair Display: 標題 (優雅襯線)
+       - DM Sans: 內文 (現代人文無襯線)
+       - Pinyon Script: 手寫副標 (浪漫手寫體)
+    */
+    @import url('https://fonts.googleapis.com/css2?family=DM+Sans:opsz,wght@9..40,400;500&family=Pinyon+Script&family=Playfair+Display:ital,wght@0,400;0,600;0,700;1,400&display=swap');
+
+    /* 全站基礎設定 */
+    .stApp {{
+        background-color: {colors['bg']};
+        color: {colors['text_main']};
+        font-family: 'DM Sans', sans-serif;
+    }}
+
+    /* 標題字體策略 */
+    h1, h2, h3, .serif-font {{
+        font-family: 'Playfair Display', serif !important;
+        font-weight: 700;
+        color: {colors['text_main']};
+    }}
+    
+    /* 手寫字體樣式 */
+    .handwriting {{
+        font-family: 'Pinyon Script', cursive;
+        font-weight: 400;
+        font-size: 1.5rem;
+        color: {colors['text_sub']};
+    }}
+
+    /* 側邊欄客製化 (The Gallery Guide) */
+    [data-testid="stSidebar"] {{
+        background-color: {colors['bg']};
+        border-right: 1px solid rgba(74, 44, 44, 0.1);
+    }}
+    
+    .sidebar-logo {{
+        font-family: 'Playfair Display', serif;
+        font-size: 2rem;
+        color: {colors['accent_primary']};
+        font-weight: bold;
+        letter-spacing: -1px;
+        margin-bottom: 5px;
+    }}
+    
+    .sidebar-sub {{
+        font-family: 'DM Sans', sans-serif;
+        font-size: 0.8rem;
+        letter-spacing: 3px;
+        color: {colors['text_sub']};
+        text-transform: uppercase;
+        margin-bottom: 40px;
+    }}
+
+    /* 隱藏預設 Header 與 Footer */
+    header {{visibility: hidden;}}
+    footer {{visibility: hidden;}}
+    
+    /* ------------------------------------
+       視覺組件樣式 (Components)
+       ------------------------------------ */
+
+    /* 1. 精神宣言大標題 (Hero Text: The Manifesto) */
+    .hero-title-box {{
+        margin-bottom: 30px;
+    }}
+    
+    .hero-line-1 {{
+        font-family: 'Playfair Display', serif;
+        font-size: 5.5rem;
+        line-height: 0.9;
+        font-weight: 700;
+        color: {colors['accent_primary']}; /* Velvet Rose */
+    }}
+    
+    .hero-line-2 {{
+        font-family: 'Playfair Display', serif;
+        font-size: 5.5rem;
+        line-height: 0.9;
+        font-weight: 700;
+        color: {colors['text_main']}; /* Warm Cocoa */
+    }}
+
+    /* 2. 語錄框 (Sticky Note -> Elegant Quote) */
+    .romantic-quote-box {{
+        background-color: {colors['quote_bg']};
+        padding: 30px 40px;
+        border-radius: 16px;
+        position: relative;
+        margin-top: 20px;
+        /* 左側漸層飾條 */
+        border-left: 6px solid {colors['accent_primary']}; 
+        border-image: linear-gradient(to bottom, {colors['accent_primary']}, {colors['accent_secondary']}) 1 100%;
+        box-shadow: 0 10px 30px -10px rgba(217, 46, 70, 0.1);
+    }}
+    
+    .quote-content {{
+        font-family: 'Playfair Display', serif;
+        font-size: 1.3rem;
+        line-height: 1.6;
+        color: {colors['text_main']};
+        font-style: italic;
+    }}
+    
+    .quote-meta {{
+        font-family: 'DM Sans', sans-serif;
+        font-size: 0.85rem;
+        color: {colors['accent_secondary']};
+        text-transform: uppercase;
+        letter-spacing: 1.5px;
+        margin-top: 15px;
+        text-align: right;
+    }}
+
+    /* 3. 策展人卡片 (Curator Profile: Sunset Gradient) */
+    .curator-card {{
+        /* 晚霞漸層：玫瑰紅 -> 蜜桃 -> 煙燻紫 */
+        background: linear-gradient(135deg, {colors['accent_primary']} 0%, #FF9A9E 50%, {colors['accent_secondary']} 100%);
+        border-radius: 24px;
+        padding: 40px;
+        color: white;
+        box-shadow: 0 20px 50px -15px rgba(217, 46, 70, 0.3);
+        position: relative;
+        overflow: hidden;
+        min-height: 450px;
+        display: flex;
+        flex-direction: column;
+        justify-content: space-between;
+    }}
+    
+    /* 玻璃擬態質感遮罩 */
+    .glass-overlay {{
+        background: rgba(255, 255, 255, 0.1);
+        backdrop-filter: blur(10px);
+        border-radius: 16px;
+        padding: 20px;
+        margin-top: 20px;
+        border: 1px solid rgba(255, 255, 255, 0.2);
+    }}
+
+    .card-title {{
+        font-family: 'Playfair Display', serif;
+        font-size: 2.5rem;
+        margin-bottom: 5px;
+    }}
+    
+    .card-subtitle {{
+        font-family: 'Pinyon Script', cursive;
+        font-size: 1.8rem;
+        opacity: 0.9;
+    }}
+
+    /* 按鈕客製化 (Magazine Style) */
+    .stButton > button {{
+        background-color: transparent;
+        color: {colors['accent_primary']};
+        border: 1px solid {colors['accent_primary']};
+        border-radius: 0px; /* 方形按鈕 */
+        padding: 8px 24px;
+        font-family: 'DM Sans', sans-serif;
+        letter-spacing: 1px;
+        transition: all 0.4s ease;
+    }}
+    
+    .stButton > button:hover {{
+        background-color: {colors['accent_primary']};
+        color: white;
+        border-color: {colors['accent_primary']};
+        box-shadow: 0 5px 15px rgba(217, 46, 70, 0.2);
+    }}
+    
+    /* 分隔線 */
+    hr {{
+        border-color: rgba(74, 44, 44, 0.15);
+        margin: 30px 0;
+    }}
+
+</style>
+"""
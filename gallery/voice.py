@@ -0,0 +1,119 @@
+import html
+
+import streamlit as st
+
+from gallery.data import NEWS_CACHE_TTL, current_news_version, get_muse_news
+from gallery.theme import colors
+
+# ----------------------------------------------------
+# A. i-voice: Artist's Statement (原本的首頁)
+# ----------------------------------------------------
+# 固定的 HTML 區塊在模組載入時組好 (每個行程一次)，rerun 時直接送出
+# 頂部裝飾
+HEADER_HTML = f"""
+<div style="display: flex; align-items: baseline; margin-bottom: 20px;">
+    <span style="font-family: 'DM Sans'; font-weight: bold; color: {colors['text_sub']}; letter-spacing: 2px; font-size: 0.8rem;">EXHIBITION NO. 05</span>
+    <span style="margin-left: auto; font-family: 'Pinyon Script'; color: {colors['accent_primary']}; font-size: 1.5rem;">The Manifesto</span>
+</div>
+"""
+
+# 雙色主標題
+HERO_HTML = """
+<div class="hero-title-box">
+    <div class="hero-line-1">I NEVER</div>
+    <div class="hero-line-2">DIE</div>
+</div>
+"""
+
+# 內文敘述
+STATEMENT_HTML = f"""
+<div style="font-size: 1.1rem; line-height: 1.8; color: {colors['text_main']}; text-align: justify; margin-bottom: 20px;">
+    歡迎來到 <b>i-dle DIMENSION</b> 的浪漫篇章。在這裡，我們褪去了冰冷的武裝，
+    將每一次的破碎與重生，都凝視為藝術。
+    <span style="color: {colors['accent_primary']}; font-style: italic;">"玫瑰即使凋零，依然是花中女王。"</span>
+</div>
+"""
+
+# 優雅語錄框
+QUOTE_HTML = """
+<div class="romantic-quote-box">
+    <div class="quote-content">
+        "We frame our scars in gold and velvet,<br>
+        turning every battle into a masterpiece."
+    </div>
+    <div class="quote-meta">— The Curator's Note</div>
+</div>
+"""
+
+MUSE_OPTIONS = ["Miyeon", "Minnie", "Soyeon", "Yuqi", "Shuhua"]
+TRAITS = {
+    "Soyeon": "The Visionary Architect", "Miyeon": "The Classical Muse",
+    "Minnie": "The Dreamy Surrealist", "Yuqi": "The Bold Expressionist",
+    "Shuhua": "The Naturalist Icon"
+}
+
+
+@st.cache_data(ttl=NEWS_CACHE_TTL, show_spinner=False)
+def curator_card_html(selected_muse, version=None):
+    """策展人卡片的 HTML；同一位成員、資料庫沒變動時直接用快取"""
+    # 這位成員最新的新聞
+    muse_news = get_muse_news(selected_muse, 3, version)
+    muse_news_html = "".join(
+        f'<div style="font-size: 0.85rem; line-height: 1.4; margin-top: 8px;">· {html.escape(row["news"])}</div>'
+        for row in muse_news
+    )
+    if muse_news_html:
+        muse_news_html = f"""
+            <div style="margin-top: 15px; padding-top: 10px; border-top: 1px solid rgba(255, 255, 255, 0.3);">
+                <div style="font-size: 0.7rem; text-transform: uppercase; letter-spacing: 1px;">Latest Headlines</div>
+                {muse_news_html}
+            </div>"""
+
+    # 策展人卡片 HTML (加上 muse 變數)
+    return f"""
+    <div class="curator-card">
+        <div>
+            <div class="card-title">{selected_muse}</div>
+            <div class="card-subtitle">{TRAITS[selected_muse]}</div>
+        </div>
+        <div style="flex-grow: 1; display: flex; align-items: center; justify-content: center; opacity: 0.2;">
+             <span style="font-size: 8rem; font-family: 'Playfair Display';">i-dle</span>
+        </div>
+        <div class="glass-overlay">
+            <div style="display: flex; justify-content: space-between; align-items: end;">
+                <div>
+                    <div style="font-size: 0.7rem; text-transform: uppercase; letter-spacing: 1px; margin-bottom: 5px;">Collection Status</div>
+                    <div style="font-family: 'Playfair Display'; font-size: 1.5rem;">On Display</div>
+                </div>
+                <div style="text-align: right;">
+                    <div style="font-size: 0.7rem; text-transform: uppercase; letter-spacing: 1px; margin-bottom: 5px;">Gallery Zone</div>
+                    <div style="font-family: 'Pinyon Script'; font-size: 1.8rem;">Zone 2026</div>
+                </div>
+            </div>{muse_news_html}
+        </div>
+    </div>
+    """
+
+
+@st.fragment
+def curator_card():
+    """換成員時只重跑這張卡片，不會重送整頁"""
+    selected_muse = st.selectbox("Select Muse", MUSE_OPTIONS, label_visibility="collapsed")
+    st.markdown(curator_card_html(selected_muse, current_news_version()), unsafe_allow_html=True)
+
+
+def render():
+    """宣言與策展人卡片"""
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
+
+    col_left, col_space, col_right = st.columns([1.1, 0.1, 1.2])
+
+    with col_left:
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown(HERO_HTML, unsafe_allow_html=True)
+        st.markdown(STATEMENT_HTML, unsafe_allow_html=True)
+        st.markdown(QUOTE_HTML, unsafe_allow_html=True)
+
+    with col_right:
+        # 策展人卡片邏輯 (保留你原本寫好的)
+        curator_card()
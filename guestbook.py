@@ -0,0 +1,144 @@
+import atexit
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from storage import connection, insert_guestbook_many, to_db_time
+
+# ==========================================
+# ⚙️ 留言板設定 (Guestbook Configuration)
+# ==========================================
+# 每則留言都各自寫一次資料庫的話，訪客一多就會跟 fetch_job 搶寫入鎖；
+# 改成先放進行程內的佇列，湊滿 FLUSH_SIZE 則或等滿 FLUSH_MS 毫秒再一次寫入
+FLUSH_SIZE = 20
+FLUSH_MS = 500
+MAX_PENDING = 1000          # 佇列上限；資料庫一直寫不進去時不會無限吃記憶體
+MAX_RETRY_DELAY = 30        # 寫入失敗後重試的間隔從 FLUSH_MS 開始加倍，最多等幾秒
+MAX_MESSAGE_CHARS = 500
+RATE_LIMIT = 3              # 每個 session 在 RATE_WINDOW 秒內最多留幾則
+RATE_WINDOW = 60
+
+
+class RateLimited(RuntimeError):
+    pass
+
+
+class GuestbookBusy(RuntimeError):
+    pass
+
+
+# ==========================================
+# 🚦 每個 session 的速率限制 (Per-session Rate Limit)
+# ==========================================
+class RateLimiter:
+    """滑動視窗：同一個 key 在 window 秒內最多 limit 次"""
+
+    def __init__(self, limit=RATE_LIMIT, window=RATE_WINDOW):
+        self.limit = limit
+        self.window = window
+        self._hits = {}
+        self._lock = threading.Lock()
+
+    def check(self, key):
+        """還有額度就記一次並回傳 0，否則回傳還要等幾秒"""
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.setdefault(key, deque())
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return hits[0] + self.window - now
+            hits.append(now)
+            # 順便清掉很久沒動的 session，避免字典一直長大
+            if len(self._hits) > 10000:
+                self._hits = {k: v for k, v in self._hits.items() if v and v[-1] > now - self.window}
+            return 0
+
+
+# ==========================================
+# ✍️ 延後寫入 (Write-behind Buffer)
+# ==========================================
+class GuestbookWriter:
+    """留言先進佇列，由背景執行緒分批寫進資料庫
+
+    submit() 只做檢查和放進佇列，不碰資料庫，網頁馬上就能回應；
+    寫入失敗 (例如資料庫被鎖太久) 的那一批會留著下次再試。
+    程式結束時 (atexit) 會把剩下的寫完。
+    """
+
+    def __init__(self, path=None, flush_size=FLUSH_SIZE, flush_ms=FLUSH_MS, limiter=None):
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_ms = flush_ms
+        self.limiter = limiter or RateLimiter()
+        self._queue = queue.Queue(MAX_PENDING)
+        self._pending = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="guestbook-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, message, session=None):
+        """檢查並排進佇列，回傳整理過的留言；太頻繁丟 RateLimited，佇列滿了丟 GuestbookBusy"""
+        message = " ".join((message or "").split())[:MAX_MESSAGE_CHARS]
+        if not message:
+            raise ValueError("留言是空的")
+        wait = self.limiter.check(session)
+        if wait:
+            raise RateLimited(f"留言太頻繁了，請 {wait:.0f} 秒後再試")
+        try:
+            self._queue.put_nowait((message, session, to_db_time(datetime.now(timezone.utc))))
+        except queue.Full:
+            raise GuestbookBusy("留言板忙碌中，請稍後再試")
+        return message
+
+    def _run(self):
+        delay = 0
+        while not self._stop.is_set():
+            self._collect(self.flush_ms / 1000)
+            if self._flush() is None:
+                # 寫入失敗時手上的留言還是滿的，_collect 會馬上回來；先等一下再試，連續失敗就越等越久
+                delay = min(MAX_RETRY_DELAY, delay * 2 or self.flush_ms / 1000)
+                self._stop.wait(delay)
+            else:
+                delay = 0
+
+    def _collect(self, timeout):
+        # 最多等 timeout 秒，或湊滿 flush_size 則就先回去寫
+        deadline = time.monotonic() + timeout
+        while len(self._pending) < self.flush_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                self._pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+    def _flush(self):
+        """寫入手上的留言，回傳寫入則數；寫入失敗回傳 None，留言留著下次再試"""
+        if not self._pending:
+            return 0
+        try:
+            with connection(self.path) as conn, conn:
+                insert_guestbook_many(conn, self._pending)
+        except Exception as e:
+            print(f"留言寫入失敗，稍後再試：{e}")
+            return None
+        written, self._pending = len(self._pending), []
+        return written
+
+    def close(self):
+        """停止背景執行緒，把佇列裡剩下的留言全部寫完"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        while True:
+            try:
+                self._pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._flush()
@@ -0,0 +1,195 @@
+import multiprocessing
+import os
+import queue
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import database
+import metrics
+from database import MAX_WORKERS, PER_HOST_LIMIT, default_feeds, fetch_feed, make_session
+from storage import (BATCH_SIZE, begin_news_write, bulk_mode, close_all, cluster_news_since, connection, db_size,
+                     insert_news_many, load_feed_states, save_feed_state, save_run_summary, tag_news_since, to_db_time)
+
+# ==========================================
+# ⚙️ 多行程抓取設定 (Multi-process Ingest Configuration)
+# ==========================================
+# 來源很多時，一個行程解析 RSS 會吃滿一顆 CPU；改成多個行程各抓一部分來源，
+# 解析好的結果經由佇列交給唯一的寫入行程，只有它會開資料庫連線來寫，不會互搶寫入鎖
+PROCESSES = os.cpu_count() or 2
+THREADS_PER_PROCESS = MAX_WORKERS   # 每個抓取行程裡同時幾個連線 (網路等待用執行緒就夠)
+QUEUE_SIZE = 256                    # 佇列上限：寫入跟不上時抓取行程會先等，不會把記憶體塞爆
+FLUSH_SECONDS = 0.2                 # 佇列安靜這麼久就先把手上的寫進去
+CHECK_SECONDS = 1.0                 # 佇列滿著的時候，隔多久確認一次寫入行程還活著
+
+# spawn 在每個平台都一樣，也不會把父行程的資料庫連線複製到子行程
+_CONTEXT = multiprocessing.get_context("spawn")
+_queue = None
+_stop = None
+
+
+def _put(q, item, alive):
+    """佇列滿了就等；等的期間 alive() 變成 False (對方已經不會再讀了) 回傳 False，不會永遠卡住"""
+    while True:
+        try:
+            q.put(item, timeout=CHECK_SECONDS)
+            return True
+        except queue.Full:
+            if not alive():
+                return False
+
+
+# ==========================================
+# 🌐 抓取行程 (Fetch Workers)
+# ==========================================
+def _init_fetcher(out, stop, host_slots):
+    """host_slots：主行程建立的跨行程 Semaphore ({網站: 上限})，換掉 database 裡每個行程各自一份的，
+    不管開幾個抓取行程，同一個網站的同時連線數加起來還是 PER_HOST_LIMIT"""
+    global _queue, _stop
+    _queue, _stop = out, stop
+    database._host_locks.update(host_slots)
+
+
+def _fetch_shard(feeds, states, threads=THREADS_PER_PROCESS):
+    """在抓取行程裡執行：抓取並解析這一份來源，每抓完一個就丟進佇列"""
+    with make_session(threads) as session, ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = {pool.submit(fetch_feed, session, feed, states.get(feed["url"])): feed for feed in feeds}
+        for future in as_completed(futures):
+            if not _put(_queue, (futures[future]["url"], future.result()), lambda: not _stop.is_set()):
+                raise RuntimeError("寫入行程已經結束，停止抓取")
+    return len(feeds)
+
+
+# ==========================================
+# ✍️ 寫入行程 (Single Writer)
+# ==========================================
+def _write_batch(conn, pending, fetched_at, batch_size, bulk):
+    """把累積的來源結果在一個 transaction 裡寫入，回傳新增筆數"""
+    with bulk_mode(conn) if bulk else nullcontext(), conn:
+        since_id = begin_news_write(conn)
+        stored = insert_news_many(conn, (item for r in pending.values() for item in r["items"]),
+                                  fetched_at, batch_size)
+        tag_news_since(conn, since_id)
+        cluster_news_since(conn, since_id)
+        for url, r in pending.items():
+            save_feed_state(conn, url, r["state"])
+    return stored
+
+
+def _writer(inbox, outbox, feeds, started_at, started, batch_size, bulk):
+    """唯一會寫資料庫的行程：收到 None 代表抓取全部結束，寫完剩下的、記錄數據後回報
+
+    feeds 只需要 name / url (寫 log 用)；started 是主行程開始的 time.time()，整個任務的耗時從那裡算。
+    """
+    fetched_at = to_db_time(datetime.now(timezone.utc))
+    results, pending = {}, {}
+    stored = db_write_ms = 0
+    pending_items = 0
+    finished = False
+    with connection() as conn:
+        while not finished:
+            try:
+                message = inbox.get(timeout=FLUSH_SECONDS)
+            except queue.Empty:
+                message = ()
+            if message is None:
+                finished = True
+            elif message:
+                url, result = message
+                results[url] = result
+                if result["status"] == "ok":
+                    pending[url] = result
+                    pending_items += len(result["items"])
+
+            # 湊滿一批、佇列安靜下來或全部結束時寫入
+            if pending and (finished or not message or pending_items >= batch_size):
+                write_started = time.perf_counter()
+                stored += _write_batch(conn, pending, fetched_at, batch_size, bulk)
+                db_write_ms += (time.perf_counter() - write_started) * 1000
+                pending, pending_items = {}, 0
+
+        summary = metrics.summarize(started_at, time.time() - started, results,
+                                    stored, round(db_write_ms, 1), db_size())
+        with conn:
+            save_run_summary(conn, summary)
+    close_all()
+    metrics.log_feeds(feeds, results)
+    metrics.log_json("run", mode="ingest", **summary)
+    metrics.write_prometheus(summary)
+    # 回報給主行程時不帶 items，只留狀態與數據
+    outbox.put((summary, {url: {k: v for k, v in r.items() if k != "items"} for url, r in results.items()}))
+
+
+# ==========================================
+# 🚀 多行程抓取 (Ingest)
+# ==========================================
+def ingest(feeds=None, processes=PROCESSES, batch_size=BATCH_SIZE, bulk=False):
+    """多行程版的 fetch_job：processes 個行程分頭抓取、解析，一個寫入行程負責所有寫入
+
+    回傳每個來源的結果 (不含 items)；整個任務失敗時回傳 None。
+    """
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 啟動多行程抓取：{processes} 個抓取行程 + 1 個寫入行程...")
+    feeds = feeds if feeds is not None else default_feeds()
+    started = time.time()
+    started_at = datetime.now().isoformat(timespec="seconds")
+
+    # 讀取不會跟寫入行程搶鎖 (WAL)，先在這裡把上次的狀態讀好
+    with connection() as conn:
+        states = load_feed_states(conn)
+
+    inbox, outbox, stop = _CONTEXT.Queue(QUEUE_SIZE), _CONTEXT.Queue(), _CONTEXT.Event()
+    names = [{"name": feed["name"], "url": feed["url"]} for feed in feeds]
+    writer = _CONTEXT.Process(target=_writer, args=(inbox, outbox, names, started_at, started, batch_size, bulk),
+                              name="idle-writer")
+    writer.start()
+    failed = False
+    try:
+        # 來源輪流分給各個行程，每個行程一份
+        shards = [feeds[i::processes] for i in range(processes) if feeds[i::processes]]
+        hosts = {urlparse(feed["url"]).netloc for feed in feeds}
+        with _CONTEXT.Manager() as manager:
+            host_slots = {host: manager.BoundedSemaphore(PER_HOST_LIMIT) for host in hosts}
+            with ProcessPoolExecutor(max_workers=len(shards) or 1, mp_context=_CONTEXT,
+                                     initializer=_init_fetcher, initargs=(inbox, stop, host_slots)) as pool:
+                futures = [pool.submit(_fetch_shard, shard, {f["url"]: states.get(f["url"]) for f in shard})
+                           for shard in shards]
+                pending = set(futures)
+                while pending:
+                    _, pending = wait(pending, timeout=CHECK_SECONDS)
+                    if pending and not writer.is_alive():
+                        # 沒有人讀佇列了：讓抓取行程別再等著放結果，直接結束
+                        stop.set()
+                        raise RuntimeError(f"寫入行程意外結束 (exit code {writer.exitcode})")
+                for future in futures:
+                    future.result()
+    except Exception as e:
+        failed = True
+        print(f"發生錯誤：{e}")
+        metrics.log_json("run_failed", started_at=started_at, error=str(e))
+    finally:
+        # 就算抓取出錯，已經送進佇列的結果還是會寫完
+        _put(inbox, None, writer.is_alive)
+
+    while True:
+        try:
+            summary, results = outbox.get(timeout=1)
+            break
+        except queue.Empty:
+            if not writer.is_alive():
+                if not failed:  # 抓取途中就發現的話上面已經記過了
+                    print(f"寫入行程意外結束 (exit code {writer.exitcode})")
+                    metrics.log_json("run_failed", started_at=started_at, error=f"writer exit {writer.exitcode}")
+                return None
+    writer.join()
+    if failed:
+        return None
+
+    counts = Counter(r["status"] for r in results.values())
+    print(f"任務完成：{len(feeds)} 個來源 "
+          f"(更新 {counts.get('ok', 0)}、304 {counts.get('not_modified', 0)}、"
+          f"內容相同 {counts.get('unchanged', 0)}、失敗 {counts.get('error', 0)})，"
+          f"新增 {summary['items_new']} 則，耗時 {time.time() - started:.1f} 秒。")
+    return results
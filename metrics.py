@@ -0,0 +1,97 @@
+import json
+import os
+import statistics
+from datetime import datetime
+
+# ==========================================
+# 📈 量測輸出設定 (Metrics Configuration)
+# ==========================================
+# 每次抓取的數據會寫成三份：JSON log (一行一筆)、Prometheus 文字檔、資料庫的 fetch_runs 表
+METRICS_LOG = os.environ.get("IDLE_METRICS_LOG", "fetch_metrics.jsonl")
+METRICS_PROM = os.environ.get("IDLE_METRICS_PROM", "fetch_metrics.prom")
+
+STATUSES = ["ok", "not_modified", "unchanged", "error"]
+
+
+def log_json(event, path=None, **fields):
+    """在 JSON log 追加一行；path 設成空字串就不寫"""
+    path = METRICS_LOG if path is None else path
+    if not path:
+        return
+    record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "event": event, **fields}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def log_feeds(feeds, results, path=None):
+    """每個來源一行：狀態、HTTP 延遲、位元組、解析時間、取到幾則"""
+    names = {feed["url"]: feed["name"] for feed in feeds}
+    for url, r in results.items():
+        log_json("feed", path, feed=names.get(url, url), url=url, status=r["status"],
+                 http_status=r.get("http_status"), http_ms=r.get("http_ms"), body_ms=r.get("body_ms"),
+                 parse_ms=r.get("parse_ms"), bytes=r.get("bytes", 0), items=len(r.get("items") or []),
+                 error=r.get("error"))
+
+
+def summarize(started_at, duration_s, results, items_new, db_write_ms, db_size_bytes):
+    """把一次抓取整理成一筆摘要 (也是 fetch_runs 表的一列)"""
+    http_ms = [r["http_ms"] for r in results.values() if r.get("http_ms") is not None]
+    items_seen = sum(len(r.get("items") or []) for r in results.values())
+    summary = {
+        "started_at": started_at,
+        "duration_s": round(duration_s, 3),
+        "feeds": len(results),
+        **{f"feeds_{status}": sum(1 for r in results.values() if r["status"] == status) for status in STATUSES},
+        "http_bytes": sum(r.get("bytes") or 0 for r in results.values()),
+        "http_ms_p50": round(statistics.median(http_ms), 1) if http_ms else None,
+        "http_ms_max": max(http_ms) if http_ms else None,
+        "parse_ms_total": round(sum(r.get("parse_ms") or 0 for r in results.values()), 1),
+        "items_seen": items_seen,
+        "items_new": items_new,
+        "items_duplicate": items_seen - items_new,
+        "db_write_ms": db_write_ms,
+        "db_size_bytes": db_size_bytes,
+    }
+    return summary
+
+
+def write_prometheus(summary, path=None):
+    """寫成 Prometheus textfile collector 的格式 (node_exporter 會讀取)；先寫暫存檔再改名"""
+    path = METRICS_PROM if path is None else path
+    if not path:
+        return
+    started = datetime.fromisoformat(summary["started_at"])
+    lines = [
+        "# HELP idle_fetch_last_run_timestamp_seconds Start time of the last fetch run.",
+        "# TYPE idle_fetch_last_run_timestamp_seconds gauge",
+        f"idle_fetch_last_run_timestamp_seconds {started.timestamp():.0f}",
+        "# HELP idle_fetch_duration_seconds Wall time of the last fetch run.",
+        "# TYPE idle_fetch_duration_seconds gauge",
+        f"idle_fetch_duration_seconds {summary['duration_s']}",
+        "# HELP idle_fetch_feeds Feeds in the last run by status.",
+        "# TYPE idle_fetch_feeds gauge",
+        *(f'idle_fetch_feeds{{status="{status}"}} {summary[f"feeds_{status}"]}' for status in STATUSES),
+        "# HELP idle_fetch_http_bytes Response bytes read in the last run.",
+        "# TYPE idle_fetch_http_bytes gauge",
+        f"idle_fetch_http_bytes {summary['http_bytes']}",
+        "# HELP idle_fetch_http_latency_ms Time to response headers in the last run.",
+        "# TYPE idle_fetch_http_latency_ms gauge",
+        f'idle_fetch_http_latency_ms{{quantile="0.5"}} {summary["http_ms_p50"] or 0}',
+        f'idle_fetch_http_latency_ms{{quantile="1"}} {summary["http_ms_max"] or 0}',
+        "# HELP idle_fetch_parse_ms Total parse time in the last run.",
+        "# TYPE idle_fetch_parse_ms gauge",
+        f"idle_fetch_parse_ms {summary['parse_ms_total']}",
+        "# HELP idle_fetch_items Items in the last run by outcome.",
+        "# TYPE idle_fetch_items gauge",
+        *(f'idle_fetch_items{{kind="{kind}"}} {summary[f"items_{kind}"]}' for kind in ("seen", "new", "duplicate")),
+        "# HELP idle_fetch_db_write_ms Time spent in the write transaction.",
+        "# TYPE idle_fetch_db_write_ms gauge",
+        f"idle_fetch_db_write_ms {summary['db_write_ms']}",
+        "# HELP idle_db_size_bytes Size of idle_data.db including the WAL file.",
+        "# TYPE idle_db_size_bytes gauge",
+        f"idle_db_size_bytes {summary['db_size_bytes']}",
+    ]
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)
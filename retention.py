@@ -0,0 +1,87 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import metrics
+from export import EXPORT_DIR, export_new
+from scheduler import run_lock
+from storage import (ARCHIVE_PATH, BATCH_SIZE, DB_PATH, HOT_DAYS, archive_attached, archive_expired, close_all,
+                     connection, db_size, to_db_time)
+
+# ==========================================
+# ⚙️ 保留與封存設定 (Retention Configuration)
+# ==========================================
+# 主資料庫只留最近 storage.HOT_DAYS 天的新聞，儀表板的查詢和檔案大小才不會一直長大；
+# 更舊的搬到唯讀的封存資料庫 (storage.ARCHIVE_PATH)，搜尋時才 ATTACH，歷史一樣找得到。
+# 趨勢圖用的 news_daily 不會扣回，搬走的新聞仍然算在每天的數量裡。
+ANALYSIS_LIMIT = 1000    # ANALYZE 每個索引最多看幾列 (估計值就夠用，大資料庫也很快)
+LOCK_PATH = DB_PATH + ".retention.lock"
+
+
+# ==========================================
+# 🧹 整理主資料庫 (Compaction)
+# ==========================================
+def compact(conn):
+    """刪掉大量資料後整理：合併全文索引、把空頁還給檔案系統、更新查詢規劃用的統計
+
+    舊的資料庫 (v13 之前建的) 沒有開 incremental auto_vacuum，第一次會整個 VACUUM 轉換，之後只做 incremental。
+    """
+    with conn:
+        conn.execute("INSERT INTO news_fts (news_fts) VALUES ('optimize')")
+        conn.execute("INSERT INTO news_body_fts (news_body_fts) VALUES ('optimize')")
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+    else:
+        conn.execute("PRAGMA incremental_vacuum").fetchall()
+    conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+    conn.execute("ANALYZE")
+    # WAL 模式下空間要等 checkpoint 才會真的從檔案裡去掉
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+
+# ==========================================
+# 🗄️ 封存 (Archive Run)
+# ==========================================
+def run(days=HOT_DAYS, path=None, archive_path=None, batch_size=BATCH_SIZE, vacuum=True, export_dir=EXPORT_DIR):
+    """把超過 days 天的新聞搬到封存資料庫，然後整理主資料庫；回傳 {"exported", "archived", "size_before", "size_after"}
+
+    搬之前先把還沒匯出的新聞寫進 export_dir (例如剛回補進來的舊新聞)，只搬已經匯出的，
+    封存資料庫不進 git 也不會讓歷史從 exports/ 裡消失。搬的細節見 storage.archive_expired()。
+    同一時間只能有一個 retention 在跑。
+    """
+    archive_path = archive_path or ARCHIVE_PATH
+    cutoff = to_db_time(datetime.now(timezone.utc) - timedelta(days=days))
+    archived_at = to_db_time(datetime.now(timezone.utc))
+    counts = {"archived": 0, "size_before": db_size(path)}
+    started = time.perf_counter()
+
+    with run_lock(LOCK_PATH), connection(path) as conn:
+        counts["exported"] = len(export_new(conn, export_dir))
+        with archive_attached(conn, archive_path, readonly=False):
+            counts["archived"] = archive_expired(conn, cutoff, archived_at, batch_size)
+            if counts["archived"]:
+                conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+                conn.execute("ANALYZE archive")
+        if vacuum:
+            compact(conn)
+
+    counts["size_after"] = db_size(path)
+    counts["archive_size"] = os.path.getsize(archive_path) if os.path.exists(archive_path) else 0
+    metrics.log_json("retention", days=days, cutoff=cutoff, duration_s=round(time.perf_counter() - started, 3),
+                     **counts)
+    return counts
+
+
+def retention(days=HOT_DAYS, vacuum=True):
+    """命令列入口"""
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 封存 {days} 天以前的新聞...")
+    try:
+        counts = run(days, vacuum=vacuum)
+    finally:
+        close_all()
+    mb = 1024 * 1024
+    print(f"封存完成：先匯出 {counts['exported']} 個檔案，搬走 {counts['archived']} 則，"
+          f"主資料庫 {counts['size_before'] / mb:.1f} MB → {counts['size_after'] / mb:.1f} MB，"
+          f"封存資料庫 {counts['archive_size'] / mb:.1f} MB。")
+    return counts
@@ -0,0 +1,107 @@
+import os
+import random
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from database import default_feeds, fetch_job
+from storage import DB_PATH, close_all
+
+# ==========================================
+# ⏰ 排程設定 (Scheduler Configuration)
+# ==========================================
+DEFAULT_INTERVAL = 15 * 60   # 每個來源預設幾秒抓一次；個別來源可以在設定裡寫 "interval"
+JITTER = 0.1                 # 間隔隨機 ±10%，避免所有來源同一秒打出去
+MAX_BACKOFF = 6 * 60 * 60    # 連續失敗時，等待時間最多拉長到 6 小時
+LOCKED_RETRY = 60            # 別的抓取任務還在跑時，隔多久再試
+LOCK_PATH = DB_PATH + ".lock"
+
+
+class AlreadyRunning(RuntimeError):
+    pass
+
+
+# ==========================================
+# 🔒 執行鎖 (Run Lock)
+# ==========================================
+def _try_lock(handle):
+    try:
+        import fcntl
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except ImportError:
+        # Windows
+        import msvcrt
+        msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+@contextmanager
+def run_lock(path=LOCK_PATH):
+    """同一時間只允許一個抓取任務；鎖在程式結束 (包含當掉) 時由系統自動釋放"""
+    handle = open(path, "a+")
+    try:
+        try:
+            _try_lock(handle)
+        except OSError:
+            raise AlreadyRunning(f"另一個抓取任務正在執行 ({path})")
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        yield
+    finally:
+        handle.close()
+
+
+# ==========================================
+# 🔁 排程迴圈 (Scheduler Loop)
+# ==========================================
+def next_delay(interval, failures):
+    """下一次抓取要等幾秒：失敗越多次等越久 (指數退避)，再加上隨機抖動"""
+    delay = min(interval * (2 ** failures), MAX_BACKOFF) if failures else interval
+    return delay * random.uniform(1 - JITTER, 1 + JITTER)
+
+
+def serve(feeds=None, interval=None, stop=None):
+    """常駐執行：每個來源依自己的間隔抓取，直到收到 SIGINT / SIGTERM
+
+    收到停止訊號後會等目前這一輪抓完、寫完才結束，不會留下寫到一半的資料。
+    """
+    feeds = feeds if feeds is not None else default_feeds()
+    interval = interval or DEFAULT_INTERVAL
+    stop = stop or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+    due_at = {feed["url"]: time.monotonic() for feed in feeds}
+    failures = {feed["url"]: 0 for feed in feeds}
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 排程啟動：{len(feeds)} 個來源，"
+          f"預設每 {interval / 60:.0f} 分鐘抓一次。")
+
+    while not stop.is_set():
+        now = time.monotonic()
+        due = [feed for feed in feeds if due_at[feed["url"]] <= now]
+        if due:
+            try:
+                with run_lock():
+                    results = fetch_job(due) or {}
+            except AlreadyRunning as e:
+                print(f"{e}，{LOCKED_RETRY} 秒後再試。")
+                for feed in due:
+                    due_at[feed["url"]] = time.monotonic() + LOCKED_RETRY
+                continue
+
+            for feed in due:
+                url = feed["url"]
+                if results.get(url, {}).get("status", "error") == "error":
+                    failures[url] += 1
+                else:
+                    failures[url] = 0
+                due_at[url] = time.monotonic() + next_delay(feed.get("interval", interval), failures[url])
+
+        stop.wait(max(min(due_at.values()) - time.monotonic(), 1))
+
+    close_all()
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 排程已停止。")
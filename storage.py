@@ -0,0 +1,1108 @@
+import atexit
+import hashlib
+import os
+import zlib
+import queue
+import sqlite3
+import threading
+import unicodedata
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.request import pathname2url
+
+import clustering
+from tagger import tag_members
+
+# ==========================================
+# ⚙️ 資料庫設定 (Storage Configuration)
+# ==========================================
+DB_PATH = os.environ.get("IDLE_DB_PATH", "idle_data.db")
+# 超過保留天數的舊新聞搬到這個唯讀的封存資料庫 (retention.py)，搜尋時才臨時 ATTACH
+ARCHIVE_PATH = os.environ.get("IDLE_ARCHIVE_PATH", os.path.splitext(DB_PATH)[0] + "_archive.db")
+HOT_DAYS = 90            # 主資料庫只留最近幾天的新聞 (retention 和從匯出檔載入都看這個)
+POOL_SIZE = 8            # 每個資料庫檔案最多保留幾條閒置連線
+BUSY_TIMEOUT_MS = 5000   # 遇到寫入鎖時最多等多久，而不是直接丟 "database is locked"
+CACHED_STATEMENTS = 256  # 每條連線快取的已編譯 SQL 數量
+BATCH_SIZE = 500         # executemany 每批寫入幾筆
+GOOGLE_NEWS_LINK = "https://news.google.com/%"  # Google News 轉址連結 (LIKE 樣式)，補抓不了原文
+CLUSTER_WINDOW_DAYS = 3  # 發佈時間相差超過幾天就不算同一則新聞
+BUCKET_LIMIT = 20        # 每個 LSH 桶最多拿最近的幾則出來 (熱門話題的桶會很大)
+MAX_CANDIDATES = 8       # 同桶次數最多的前幾則才真的比對簽章
+
+# 大量回補 (backfill) 時暫時使用的 PRAGMA：犧牲斷電安全換寫入速度
+BULK_PRAGMAS = {
+    "synchronous": "OFF",
+    "cache_size": -200000,  # 負數代表 KiB，約 200 MB
+    "temp_store": "MEMORY",
+}
+
+
+# ==========================================
+# 🔑 新聞識別 (Item Identity)
+# ==========================================
+def normalize_title(title):
+    """統一全形半形、大小寫與空白，讓同一個標題算出同一個 key"""
+    return " ".join(unicodedata.normalize("NFKC", title).casefold().split())
+
+
+def item_key(guid=None, link=None, title=None):
+    """新聞的穩定識別碼：優先用 GUID，其次連結，最後才用正規化後的標題"""
+    if guid:
+        source = f"guid:{guid.strip()}"
+    elif link:
+        source = f"link:{link.strip()}"
+    else:
+        source = f"title:{normalize_title(title or '')}"
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+
+def to_db_time(value):
+    """datetime 轉成 UTC 的 'YYYY-MM-DD HH:MM:SS'，字串排序就等於時間排序"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ==========================================
+# 🔌 連線池 (Connection Pool)
+# ==========================================
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _open(path):
+    # uri=True 才能用 "file:...?mode=ro" 唯讀 ATTACH 封存資料庫；一般路徑不受影響
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                           cached_statements=CACHED_STATEMENTS, uri=True)
+    # 新的資料庫一開始就用 incremental auto_vacuum，清掉舊資料後可以逐步把空間還給檔案系統；
+    # 要在切換 WAL (會初始化檔案) 之前設定才有效。已經有資料的舊檔案由 retention.py 第一次執行時 VACUUM 轉換。
+    # 設定這個 pragma 要拿寫入鎖，只在空檔案上設，其他行程寫入中也能開新連線
+    if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    # WAL：寫入時讀取不會被擋住，讀取也不會擋住寫入
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _pool(path):
+    with _pools_lock:
+        if path not in _pools:
+            # 每個行程只檢查一次資料表 (建表與升級)，不用每次查詢都做
+            conn = _open(path)
+            init_db(conn)
+            _pools[path] = queue.LifoQueue(maxsize=POOL_SIZE)
+            _pools[path].put(conn)
+        return _pools[path]
+
+
+@contextmanager
+def connection(path=None):
+    """從連線池借一條連線，用完自動歸還
+
+    同一時間只會有一個執行緒用同一條連線；池子空了就開新的，歸還時池子滿了就關掉。
+    """
+    path = path or DB_PATH
+    pool = _pool(path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _open(path)
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def db_size(path=None):
+    """資料庫實際佔用的位元組 (主檔 + WAL)"""
+    path = path or DB_PATH
+    return sum(os.path.getsize(name) for name in (path, path + "-wal") if os.path.exists(name))
+
+
+def news_version(conn):
+    """新聞快取的版本：(最新一則新聞的 id, 最近一次抓取的 id)
+
+    抓取、回補、載入匯出檔都會讓它變大；留言板寫入不會動到，儀表板的新聞快取不會因為有人留言就失效。
+    兩個都是主鍵的最大值，查一次很便宜。補抓到的內文與封存不算，交給快取的 TTL。
+    """
+    return tuple(conn.execute("SELECT (SELECT COALESCE(MAX(id), 0) FROM members), "
+                              "(SELECT COALESCE(MAX(id), 0) FROM fetch_runs)").fetchone())
+
+
+def guestbook_version(conn):
+    """留言板快取的版本：最新一則留言的 id"""
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM guestbook").fetchone()[0]
+
+
+@atexit.register
+def close_all():
+    """關掉所有閒置連線；最後一條連線關閉時 SQLite 會把 WAL 併回主檔"""
+    with _pools_lock:
+        for pool in _pools.values():
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+        _pools.clear()
+
+
+# ==========================================
+# 🧱 資料表與升級 (Schema & Migrations)
+# ==========================================
+def _create_base_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            news TEXT
+        )
+    ''')
+    # 每個來源上次抓取的快取資訊 (條件式請求用)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feed_state (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            body_hash TEXT,
+            updated_at TEXT
+        )
+    ''')
+
+
+def _migrate_item_keys(conn):
+    """v1：幫每筆新聞加上 item_key，合併過去重複存入的標題，再建立 UNIQUE 索引"""
+    conn.execute("ALTER TABLE members ADD COLUMN item_key TEXT")
+    rows = conn.execute("SELECT id, news FROM members").fetchall()
+    conn.executemany("UPDATE members SET item_key = ? WHERE id = ?",
+                     [(item_key(title=news), row_id) for row_id, news in rows])
+    # 同一個 key 只留最早的那一筆
+    conn.execute("DELETE FROM members WHERE id NOT IN (SELECT MIN(id) FROM members GROUP BY item_key)")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_members_item_key ON members (item_key)")
+
+
+def _migrate_feed_last_keys(conn):
+    """v2：記下每個來源上次取到的新聞 key，串流解析時可以提早停止"""
+    conn.execute("ALTER TABLE feed_state ADD COLUMN last_keys TEXT")
+
+
+def _migrate_news_details(conn):
+    """v3：保存發佈時間、連結、來源、成員標記與抓取時間，並建立查詢用索引"""
+    for column in ("pub_date", "link", "source", "member", "fetched_at"):
+        conn.execute(f"ALTER TABLE members ADD COLUMN {column} TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_members_member_pub_date ON members (member, pub_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_members_pub_date ON members (pub_date)")
+
+
+def _migrate_news_fts(conn):
+    """v4：標題全文檢索 (FTS5)
+
+    trigram 斷詞對中文、韓文這種沒有空白分隔的文字也能做子字串搜尋。
+    用 trigger 跟 members 同步，不管是抓取新增還是之後刪除都不會漏。
+    """
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+            news, content='members', content_rowid='id', tokenize='trigram'
+        )
+    ''')
+    conn.executescript('''
+        CREATE TRIGGER IF NOT EXISTS members_fts_insert AFTER INSERT ON members BEGIN
+            INSERT INTO news_fts (rowid, news) VALUES (new.id, new.news);
+        END;
+        CREATE TRIGGER IF NOT EXISTS members_fts_delete AFTER DELETE ON members BEGIN
+            INSERT INTO news_fts (news_fts, rowid, news) VALUES ('delete', old.id, old.news);
+        END;
+        CREATE TRIGGER IF NOT EXISTS members_fts_update AFTER UPDATE OF news ON members BEGIN
+            INSERT INTO news_fts (news_fts, rowid, news) VALUES ('delete', old.id, old.news);
+            INSERT INTO news_fts (rowid, news) VALUES (new.id, new.news);
+        END;
+    ''')
+    # 把已經存在的資料補進索引
+    conn.execute("INSERT INTO news_fts (news_fts) VALUES ('rebuild')")
+
+
+def _migrate_exports(conn):
+    """v5：記錄每筆新聞匯出到哪個檔案 (NULL = 還沒匯出)，以及已經載入過的匯出檔"""
+    conn.execute("ALTER TABLE members ADD COLUMN exported_in TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_members_not_exported ON members (id) WHERE exported_in IS NULL")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS export_files (
+            path TEXT PRIMARY KEY,
+            rows INTEGER,
+            loaded_at TEXT
+        )
+    ''')
+
+
+def _migrate_fetch_runs(conn):
+    """v6：每次抓取留一筆摘要 (耗時、位元組、新增/重複則數、資料庫大小)，方便畫趨勢圖"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS fetch_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TEXT,
+            duration_s REAL,
+            feeds INTEGER,
+            feeds_ok INTEGER,
+            feeds_not_modified INTEGER,
+            feeds_unchanged INTEGER,
+            feeds_error INTEGER,
+            http_bytes INTEGER,
+            http_ms_p50 REAL,
+            http_ms_max REAL,
+            parse_ms_total REAL,
+            items_seen INTEGER,
+            items_new INTEGER,
+            items_duplicate INTEGER,
+            db_write_ms REAL,
+            db_size_bytes INTEGER
+        )
+    ''')
+
+
+def _migrate_daily_rollup(conn):
+    """v7：每天 × 成員 × 媒體的新聞數 (趨勢圖用)
+
+    由 trigger 在新增新聞的同一個 transaction 裡累加，圖表只需要讀要顯示的那幾天。
+    只會累加不會扣回：之後封存或清掉的舊新聞仍然算在歷史趨勢裡。
+    member / source 沒有值時存成空字串，day 以發佈日期 (UTC) 為準。
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS news_daily (
+            day TEXT NOT NULL,
+            member TEXT NOT NULL,
+            source TEXT NOT NULL,
+            headlines INTEGER NOT NULL,
+            PRIMARY KEY (day, member, source)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS members_rollup_insert AFTER INSERT ON members BEGIN
+            INSERT INTO news_daily (day, member, source, headlines)
+            VALUES (substr(COALESCE(new.pub_date, new.fetched_at, ''), 1, 10),
+                    COALESCE(new.member, ''), COALESCE(new.source, ''), 1)
+            ON CONFLICT (day, member, source) DO UPDATE SET headlines = headlines + 1;
+        END
+    ''')
+    # 補上已經存在的資料
+    conn.execute('''
+        INSERT INTO news_daily (day, member, source, headlines)
+        SELECT substr(COALESCE(pub_date, fetched_at, ''), 1, 10), COALESCE(member, ''), COALESCE(source, ''), COUNT(*)
+        FROM members WHERE true
+        GROUP BY 1, 2, 3
+        ON CONFLICT (day, member, source) DO UPDATE SET headlines = headlines + excluded.headlines
+    ''')
+
+
+def _migrate_member_tags(conn):
+    """v8：新聞 × 成員的標記表，寫入時由 tagger 從標題判斷提到哪些成員
+
+    主鍵 (member, pub_date, news_id)：查某位成員的最新新聞直接走索引，不用排序。
+    news_daily 改成 member = '' 代表全部新聞，其餘是各成員被標記的新聞數
+    (一則新聞提到兩位成員，兩位都會 +1)。
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS news_members (
+            member TEXT NOT NULL,
+            pub_date TEXT,
+            news_id INTEGER NOT NULL,
+            PRIMARY KEY (member, pub_date, news_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_news_members_news_id ON news_members (news_id)")
+    conn.executescript('''
+        DROP TRIGGER IF EXISTS members_rollup_insert;
+        CREATE TRIGGER members_rollup_insert AFTER INSERT ON members BEGIN
+            INSERT INTO news_daily (day, member, source, headlines)
+            VALUES (substr(COALESCE(new.pub_date, new.fetched_at, ''), 1, 10), '', COALESCE(new.source, ''), 1)
+            ON CONFLICT (day, member, source) DO UPDATE SET headlines = headlines + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS news_members_rollup_insert AFTER INSERT ON news_members BEGIN
+            INSERT INTO news_daily (day, member, source, headlines)
+            VALUES (substr(COALESCE(new.pub_date, ''), 1, 10), new.member,
+                    COALESCE((SELECT source FROM members WHERE id = new.news_id), ''), 1)
+            ON CONFLICT (day, member, source) DO UPDATE SET headlines = headlines + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS members_tags_delete AFTER DELETE ON members BEGIN
+            DELETE FROM news_members WHERE news_id = old.id;
+        END;
+    ''')
+    # 重算累計表：先算全部新聞，成員的部分在下面補標記時由 trigger 累加
+    conn.execute("DELETE FROM news_daily")
+    conn.execute('''
+        INSERT INTO news_daily (day, member, source, headlines)
+        SELECT substr(COALESCE(pub_date, fetched_at, ''), 1, 10), '', COALESCE(source, ''), COUNT(*)
+        FROM members GROUP BY 1, 3
+    ''')
+    tag_news_since(conn, 0)
+
+
+def _migrate_clusters(conn):
+    """v9：近似重複的新聞分群 (MinHash + LSH)
+
+    members.cluster_id 指向這則新聞所屬的群，群的 id 就是第一則新聞的 id；
+    news_clusters 記每群的則數、媒體數與最新發佈時間，儀表板一個群只顯示一則。
+    news_lsh 是 LSH 的桶，新新聞只跟同桶的比，不用跟整個資料庫兩兩比對。
+    """
+    conn.execute("ALTER TABLE members ADD COLUMN cluster_id INTEGER")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_members_cluster ON members (cluster_id, source)")
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS news_clusters (
+            id INTEGER PRIMARY KEY,
+            articles INTEGER NOT NULL,
+            outlets INTEGER NOT NULL,
+            last_pub_date TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_news_clusters_last ON news_clusters (last_pub_date, id);
+        CREATE TABLE IF NOT EXISTS news_minhash (
+            news_id INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS news_lsh (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            news_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, news_id)
+        ) WITHOUT ROWID;
+        -- 刪掉的新聞：簽章一起刪，群的則數扣掉；news_lsh 裡留下的舊 id 查候選時 JOIN 不到，不影響結果
+        CREATE TRIGGER IF NOT EXISTS members_cluster_delete AFTER DELETE ON members BEGIN
+            DELETE FROM news_minhash WHERE news_id = old.id;
+            UPDATE news_clusters SET articles = articles - 1 WHERE id = old.cluster_id;
+            DELETE FROM news_clusters WHERE id = old.cluster_id AND articles <= 0;
+        END;
+    ''')
+    cluster_news_since(conn, 0)
+
+
+def _migrate_enrichment(conn):
+    """v10：文章內文補抓 (enrichment) 的工作佇列與結果
+
+    新聞寫入時由 trigger 把 id 丟進 enrich_queue，抓取任務本身完全不碰文章網頁；
+    另一個 worker (enrich.py) 從佇列取工作，結果寫進 news_bodies，並建 trigram 全文索引。
+    之前的舊新聞不補排進佇列。
+    """
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS enrich_queue (
+            news_id INTEGER PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            not_before TEXT NOT NULL DEFAULT '',
+            last_error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_enrich_queue_due ON enrich_queue (status, not_before);
+        CREATE TABLE IF NOT EXISTS news_bodies (
+            news_id INTEGER PRIMARY KEY,
+            url TEXT,
+            description TEXT,
+            excerpt TEXT,
+            fetched_at TEXT
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS news_body_fts USING fts5(
+            description, excerpt, content='news_bodies', content_rowid='news_id', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS members_enrich_insert AFTER INSERT ON members
+        WHEN new.link IS NOT NULL BEGIN
+            INSERT OR IGNORE INTO enrich_queue (news_id) VALUES (new.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS members_enrich_delete AFTER DELETE ON members BEGIN
+            DELETE FROM enrich_queue WHERE news_id = old.id;
+            DELETE FROM news_bodies WHERE news_id = old.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS news_bodies_fts_insert AFTER INSERT ON news_bodies BEGIN
+            INSERT INTO news_body_fts (rowid, description, excerpt) VALUES (new.news_id, new.description, new.excerpt);
+        END;
+        CREATE TRIGGER IF NOT EXISTS news_bodies_fts_delete AFTER DELETE ON news_bodies BEGIN
+            INSERT INTO news_body_fts (news_body_fts, rowid, description, excerpt)
+            VALUES ('delete', old.news_id, old.description, old.excerpt);
+        END;
+    ''')
+
+
+def _migrate_guestbook(conn):
+    """v11：留言板 (網站寫入是由 guestbook.py 的 write-behind 佇列分批送進來)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS guestbook (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message TEXT NOT NULL,
+            session TEXT,
+            created_at TEXT NOT NULL
+        )
+    ''')
+
+
+def _migrate_backfill(conn):
+    """v12：歷史回補 (backfill.py) 的進度，每個 (關鍵字, 語系, 日期區間) 抓完寫一列，中斷後從這裡接著跑"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS backfill_windows (
+            query TEXT NOT NULL,
+            locale TEXT NOT NULL,
+            after TEXT NOT NULL,
+            before TEXT NOT NULL,
+            items INTEGER NOT NULL,
+            stored INTEGER NOT NULL,
+            finished_at TEXT NOT NULL,
+            PRIMARY KEY (query, locale, after, before)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _migrate_undated_tags(conn):
+    """v14：補標記沒有 pub_date 的舊新聞
+
+    之前標記時直接用 NULL 的 pub_date 當主鍵，這些新聞的成員標記都被略過了。
+    """
+    _tag_rows(conn, conn.execute("SELECT id, news, COALESCE(fetched_at, ''), member FROM members "
+                                 "WHERE pub_date IS NULL"))
+
+
+def _migrate_feed_summaries(conn):
+    """v18：存下 RSS 的 <description>，Google News 的連結不再排進補抓佇列
+
+    Google News 新格式的連結是加密過的 id，離線換不出原文網址，補抓只會失敗；
+    這些新聞改用 RSS 本身的摘要 (members.summary)。還在排隊的 Google 連結直接移除。
+    """
+    conn.execute("ALTER TABLE members ADD COLUMN summary TEXT")
+    conn.execute("DROP TRIGGER IF EXISTS members_enrich_insert")
+    conn.execute(f"""
+        CREATE TRIGGER members_enrich_insert AFTER INSERT ON members
+        WHEN new.link IS NOT NULL AND new.link NOT LIKE '{GOOGLE_NEWS_LINK}' BEGIN
+            INSERT OR IGNORE INTO enrich_queue (news_id) VALUES (new.id);
+        END
+    """)
+    conn.execute(f"DELETE FROM enrich_queue WHERE status = 'pending' AND news_id IN "
+                 f"(SELECT id FROM members WHERE link LIKE '{GOOGLE_NEWS_LINK}')")
+
+
+def _migrate_cjk_boundary_tags(conn):
+    """v17：補標記英文名字緊接著中韓文的新聞
+
+    之前的邊界檢查把中韓文也當成英數字，"Soyeon發新歌" 這種標題都沒標到；INSERT OR IGNORE 只會補上少的。
+    """
+    tag_news_since(conn, 0)
+
+
+def _migrate_retention(conn):
+    """v13：搬到封存資料庫的新聞留下 item_key
+
+    同一則舊新聞之後又出現在來源裡 (或重新載入匯出檔) 時，由 trigger 直接略過，
+    不會重複寫進熱資料、也不會在 news_daily 的趨勢裡再算一次。
+    """
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS archived_keys (
+            item_key TEXT PRIMARY KEY
+        ) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS members_archived_skip BEFORE INSERT ON members
+        WHEN EXISTS (SELECT 1 FROM archived_keys WHERE item_key = new.item_key) BEGIN
+            SELECT RAISE(IGNORE);
+        END;
+    ''')
+
+
+def _migrate_recluster(conn):
+    """v15：提到不同成員的標題不再合併，既有的群全部重新分一次"""
+    for sql in ("DELETE FROM news_lsh", "DELETE FROM news_minhash", "DELETE FROM news_clusters",
+                "UPDATE members SET cluster_id = NULL"):
+        conn.execute(sql)
+    cluster_news_since(conn, 0)
+
+
+def _migrate_google_bodies(conn):
+    """v16：之前補抓時把 Google News 的轉址頁當成文章存了下來，清掉這些內文並重新排進補抓佇列"""
+    conn.execute(f"INSERT OR IGNORE INTO enrich_queue (news_id) "
+                 f"SELECT news_id FROM news_bodies WHERE url LIKE '{GOOGLE_NEWS_LINK}'")
+    conn.execute(f"DELETE FROM news_bodies WHERE url LIKE '{GOOGLE_NEWS_LINK}'")
+
+
+# 依序執行的資料表升級，版本號記在 PRAGMA user_version
+MIGRATIONS = [
+    _migrate_item_keys,
+    _migrate_feed_last_keys,
+    _migrate_news_details,
+    _migrate_news_fts,
+    _migrate_exports,
+    _migrate_fetch_runs,
+    _migrate_daily_rollup,
+    _migrate_member_tags,
+    _migrate_clusters,
+    _migrate_enrichment,
+    _migrate_guestbook,
+    _migrate_backfill,
+    _migrate_retention,
+    _migrate_undated_tags,
+    _migrate_recluster,
+    _migrate_google_bodies,
+    _migrate_cjk_boundary_tags,
+    _migrate_feed_summaries,
+]
+
+
+def init_db(conn):
+    with conn:
+        _create_base_tables(conn)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, migrate in enumerate(MIGRATIONS[version:], start=version + 1):
+            migrate(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+
+
+# ==========================================
+# ✍️ 寫入 (Writes)
+# ==========================================
+# 常用的 SQL 固定成常數：同一條連線重複執行時，sqlite3 會直接沿用已編譯好的 statement
+SAVE_FEED_STATE_SQL = (
+    "INSERT OR REPLACE INTO feed_state (url, etag, last_modified, body_hash, last_keys, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+INSERT_NEWS_SQL = (
+    "INSERT INTO members (name, news, item_key, pub_date, link, source, member, fetched_at, summary) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (item_key) DO NOTHING"
+)
+
+
+def load_feed_states(conn):
+    rows = conn.execute("SELECT url, etag, last_modified, body_hash, last_keys FROM feed_state")
+    return {url: {"etag": etag, "last_modified": lm, "body_hash": h, "last_keys": keys}
+            for url, etag, lm, h, keys in rows}
+
+
+def save_feed_state(conn, url, state):
+    conn.execute(
+        SAVE_FEED_STATE_SQL,
+        (url, state["etag"], state["last_modified"], state["body_hash"], state["last_keys"],
+         datetime.now().isoformat(timespec="seconds")),
+    )
+
+
+def _news_params(item, fetched_at):
+    # 沒有 pubDate 的新聞以抓取時間代替，才排得進時間軸
+    return ("i-dle News", item["title"], item["key"], item["pub_date"] or fetched_at,
+            item["link"], item["source"], item.get("member"), fetched_at, item.get("summary"))
+
+
+def insert_news(conn, item, fetched_at):
+    """存入一則新聞，同一則 (item_key 相同) 已經存過就略過；回傳實際新增筆數"""
+    return conn.execute(INSERT_NEWS_SQL, _news_params(item, fetched_at)).rowcount
+
+
+def insert_news_many(conn, items, fetched_at, batch_size=BATCH_SIZE):
+    """把多則新聞分批用 executemany 寫入，回傳實際新增筆數
+
+    items 可以是 generator，一次只會在記憶體裡留一批。
+    不會自己 commit：交給呼叫端用 `with conn:` 包成一個 transaction。
+    """
+    stored = 0
+    batch = []
+    for item in items:
+        batch.append(_news_params(item, fetched_at))
+        if len(batch) >= batch_size:
+            stored += conn.executemany(INSERT_NEWS_SQL, batch).rowcount
+            batch = []
+    if batch:
+        stored += conn.executemany(INSERT_NEWS_SQL, batch).rowcount
+    return stored
+
+
+def max_news_id(conn):
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM members").fetchone()[0]
+
+
+def begin_news_write(conn):
+    """開始寫入新聞的 transaction 並回傳目前的 max_news_id()，要在 `with conn:` 裡面呼叫
+
+    先用 BEGIN IMMEDIATE 拿到寫入鎖再讀最大 id：不然另一個行程 (例如 backfill 和排程抓取同時跑)
+    可能在讀完之後、寫入之前插進新聞，那幾則會被兩邊重複標記、比對，或是 since_id 之後的新聞被漏掉。
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    return max_news_id(conn)
+
+
+def tag_news_since(conn, since_id):
+    """幫 id > since_id 的新聞標記成員，回傳標記數
+
+    寫入新聞前先用 begin_news_write() 記下最大 id，寫完在同一個 transaction 裡呼叫這個就只會處理新的那幾則。
+    來源本身就指定了成員的 (members.member) 也算一個標記。
+    """
+    return _tag_rows(conn, conn.execute("SELECT id, news, COALESCE(pub_date, fetched_at, ''), member FROM members "
+                                        "WHERE id > ?", (since_id,)))
+
+
+def _tag_rows(conn, rows):
+    # news_members 是 WITHOUT ROWID，主鍵裡的 pub_date 不能是 NULL (INSERT OR IGNORE 會直接略過)，
+    # 所以沒有發佈時間的舊資料跟 news_daily 一樣改用抓取時間，兩個都沒有就是空字串
+    tags = []
+    for news_id, news, pub_date, feed_member in rows:
+        members = set(tag_members(news or ""))
+        if feed_member:
+            members.add(feed_member)
+        tags.extend((member, pub_date, news_id) for member in members)
+    conn.executemany("INSERT OR IGNORE INTO news_members (member, pub_date, news_id) VALUES (?, ?, ?)", tags)
+    return len(tags)
+
+
+# 每一段各取同桶最近的 BUCKET_LIMIT 則，合起來依「同桶段數」排序，一條 SQL 做完
+CLUSTER_CANDIDATES_SQL = (
+    "SELECT hits.news_id, m.cluster_id, m.news, s.signature FROM ("
+    + " UNION ALL ".join(f"SELECT * FROM (SELECT news_id FROM news_lsh WHERE band = {band} AND bucket = ? "
+                         f"ORDER BY news_id DESC LIMIT {BUCKET_LIMIT})" for band in range(clustering.BANDS))
+    + ") hits JOIN members m ON m.id = hits.news_id JOIN news_minhash s ON s.news_id = hits.news_id "
+      "WHERE abs(julianday(COALESCE(m.pub_date, m.fetched_at)) - julianday(?)) <= ? "
+      "GROUP BY hits.news_id ORDER BY COUNT(*) DESC, hits.news_id DESC LIMIT ?"
+)
+
+
+def _cluster_candidates(conn, buckets, when):
+    """同一個 LSH 桶、發佈時間又相近的舊新聞：[(news_id, cluster_id, news, signature)]
+
+    落在同一個桶的段數越多，相似度通常越高，所以只取同桶次數最多的 MAX_CANDIDATES 則。
+    """
+    return conn.execute(CLUSTER_CANDIDATES_SQL,
+                        (*(bucket for _, bucket in buckets), when, CLUSTER_WINDOW_DAYS, MAX_CANDIDATES)).fetchall()
+
+
+def cluster_news_since(conn, since_id):
+    """把 id > since_id 的新聞歸到近似重複的群，回傳併入既有群的則數
+
+    跟 tag_news_since 一樣，在寫入新聞的同一個 transaction 裡呼叫；依 id 順序處理，
+    同一批裡互相改寫的標題也會歸在一起。
+    """
+    rows = conn.execute("SELECT id, news, source, COALESCE(pub_date, fetched_at) FROM members "
+                        "WHERE id > ? ORDER BY id", (since_id,)).fetchall()
+    merged = 0
+    for news_id, news, source, when in rows:
+        sig = clustering.signature(news)
+        cluster_id = news_id
+        buckets = []
+        if sig is not None:
+            buckets = clustering.bands(sig)
+            best = clustering.SIMILARITY
+            members = tag_members(news or "")
+            for _, candidate_cluster, candidate_news, blob in _cluster_candidates(conn, buckets, when):
+                # 「Soyeon 發個人專輯」和「Yuqi 發個人專輯」只差一個名字，相似度很高卻是兩則新聞：
+                # 標題提到的成員不一樣就不合併
+                if candidate_cluster is None or tag_members(candidate_news or "") != members:
+                    continue
+                score = clustering.similarity(sig, clustering.unpack(blob))
+                if score >= best:
+                    best, cluster_id = score, candidate_cluster
+
+        if cluster_id == news_id:
+            conn.execute("INSERT OR REPLACE INTO news_clusters (id, articles, outlets, last_pub_date) "
+                         "VALUES (?, 1, ?, ?)", (news_id, 1 if source else 0, when))
+        else:
+            merged += 1
+            new_outlet = bool(source) and conn.execute(
+                "SELECT 1 FROM members WHERE cluster_id = ? AND source = ? LIMIT 1", (cluster_id, source)
+            ).fetchone() is None
+            conn.execute("UPDATE news_clusters SET articles = articles + 1, outlets = outlets + ?, "
+                         "last_pub_date = max(COALESCE(last_pub_date, ''), COALESCE(?, '')) WHERE id = ?",
+                         (int(new_outlet), when, cluster_id))
+        conn.execute("UPDATE members SET cluster_id = ? WHERE id = ?", (cluster_id, news_id))
+        if sig is not None:
+            conn.execute("INSERT OR REPLACE INTO news_minhash (news_id, signature) VALUES (?, ?)",
+                         (news_id, clustering.pack(sig)))
+            conn.executemany("INSERT OR IGNORE INTO news_lsh (band, bucket, news_id) VALUES (?, ?, ?)",
+                             [(band, bucket, news_id) for band, bucket in buckets])
+    return merged
+
+
+def claim_enrich_jobs(conn, limit, now):
+    """取出到期的補抓工作 (新的優先)：[(news_id, link, attempts)]
+
+    只有一個 enrich worker 在跑 (由執行鎖保證)，取出來不需要另外標記。
+    """
+    return conn.execute("SELECT q.news_id, m.link, q.attempts FROM enrich_queue q JOIN members m ON m.id = q.news_id "
+                        "WHERE q.status = 'pending' AND q.not_before <= ? ORDER BY q.news_id DESC LIMIT ?",
+                        (now, limit)).fetchall()
+
+
+def save_enrichment(conn, done, retry, failed, fetched_at):
+    """寫回一批補抓結果
+
+    done:   [(news_id, url, description, excerpt)]，完成的從佇列移除
+    retry:  [(news_id, not_before, error)]，稍後再試
+    failed: [(news_id, error)]，不再重試，留在佇列裡當紀錄
+    """
+    conn.executemany("INSERT OR REPLACE INTO news_bodies (news_id, url, description, excerpt, fetched_at) "
+                     "VALUES (?, ?, ?, ?, ?)", [(*row, fetched_at) for row in done])
+    conn.executemany("DELETE FROM enrich_queue WHERE news_id = ?", [(row[0],) for row in done])
+    conn.executemany("UPDATE enrich_queue SET attempts = attempts + 1, not_before = ?, last_error = ? "
+                     "WHERE news_id = ?", [(not_before, error, news_id) for news_id, not_before, error in retry])
+    conn.executemany("UPDATE enrich_queue SET status = 'failed', attempts = attempts + 1, last_error = ? "
+                     "WHERE news_id = ?", [(error, news_id) for news_id, error in failed])
+
+
+def save_run_summary(conn, summary):
+    columns = list(summary)
+    conn.execute(f"INSERT INTO fetch_runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                 [summary[c] for c in columns])
+
+
+def insert_guestbook_many(conn, entries):
+    """entries: [(message, session, created_at)]；不會自己 commit"""
+    conn.executemany("INSERT INTO guestbook (message, session, created_at) VALUES (?, ?, ?)", entries)
+
+
+def load_backfill_done(conn):
+    """已經抓完的回補區間：{(query, locale, after, before)}"""
+    return set(conn.execute("SELECT query, locale, after, before FROM backfill_windows"))
+
+
+def save_backfill_window(conn, window, items, stored, finished_at):
+    """window: (query, locale, after, before)；跟那個區間的新聞放在同一個 transaction 裡"""
+    conn.execute("INSERT OR REPLACE INTO backfill_windows (query, locale, after, before, items, stored, finished_at) "
+                 "VALUES (?, ?, ?, ?, ?, ?, ?)", (*window, items, stored, finished_at))
+
+
+@contextmanager
+def bulk_mode(conn, pragmas=None):
+    """暫時換上 BULK_PRAGMAS (或自訂的 pragmas)，離開時還原成原本的設定"""
+    pragmas = BULK_PRAGMAS if pragmas is None else pragmas
+    saved = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in pragmas}
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    try:
+        yield conn
+    finally:
+        for name, value in saved.items():
+            conn.execute(f"PRAGMA {name}={value}")
+
+
+# ==========================================
+# 🔎 查詢 (Queries for the dashboard)
+# ==========================================
+NEWS_COLUMNS = "id, name, news, pub_date, link, source, member, fetched_at, cluster_id"
+
+
+def _query(conn, sql, params):
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    return cursor.execute(sql, params).fetchall()
+
+
+def latest_news(conn, limit=20, offset=0):
+    """最新的 N 則新聞 (依發佈時間)"""
+    return _query(conn, f"SELECT {NEWS_COLUMNS} FROM members ORDER BY pub_date DESC, id DESC LIMIT ? OFFSET ?",
+                  (limit, offset))
+
+
+def latest_stories(conn, limit=20, offset=0):
+    """最新的 N 則「新聞事件」：近似重複的改寫只留第一則
+
+    附上 articles (則數)、outlets (媒體數)，以及補抓到的 description / excerpt (還沒補抓是 None)；
+    沒有補抓到 description 的用 RSS 本身的摘要 (members.summary)。
+    """
+    columns = ", ".join(f"m.{c}" for c in NEWS_COLUMNS.split(", "))
+    return _query(conn, f"SELECT {columns}, c.articles, c.outlets, COALESCE(b.description, m.summary) AS description, "
+                        f"b.excerpt FROM news_clusters c JOIN members m ON m.id = c.id "
+                        f"LEFT JOIN news_bodies b ON b.news_id = m.id "
+                        f"ORDER BY c.last_pub_date DESC, c.id DESC LIMIT ? OFFSET ?",
+                  (limit, offset))
+
+
+def news_since(conn, since, limit=None):
+    """某個時間點之後的新聞；since 可以是 datetime 或資料庫時間字串"""
+    if isinstance(since, datetime):
+        since = to_db_time(since)
+    return _query(conn, f"SELECT {NEWS_COLUMNS} FROM members WHERE pub_date >= ? ORDER BY pub_date DESC, id DESC "
+                        f"LIMIT ?", (since, -1 if limit is None else limit))
+
+
+def member_news(conn, member, limit=20, offset=0):
+    """標題提到某位成員的最新新聞，走 news_members 的 (member, pub_date) 主鍵"""
+    columns = ", ".join(f"m.{c}" for c in NEWS_COLUMNS.split(", "))
+    return _query(conn, f"SELECT {columns} FROM news_members nm JOIN members m ON m.id = nm.news_id "
+                        f"WHERE nm.member = ? ORDER BY nm.pub_date DESC, nm.news_id DESC LIMIT ? OFFSET ?",
+                  (member, limit, offset))
+
+
+def recent_guestbook(conn, limit=10, offset=0):
+    """最新的留言 (id 就是寫入順序，不用另外建索引)"""
+    return _query(conn, "SELECT id, message, created_at FROM guestbook ORDER BY id DESC LIMIT ? OFFSET ?",
+                  (limit, offset))
+
+
+def _day(value):
+    return value.strftime("%Y-%m-%d") if hasattr(value, "strftime") else value
+
+
+def daily_member_counts(conn, since, until):
+    """[since, until] 期間每天每位成員的新聞數 (since / until 可以是 date 或 'YYYY-MM-DD')
+
+    member 為空字串的是全部新聞的總數。
+    """
+    return _query(conn, "SELECT day, member, SUM(headlines) AS headlines FROM news_daily "
+                        "WHERE day BETWEEN ? AND ? GROUP BY day, member ORDER BY day",
+                  (_day(since), _day(until)))
+
+
+def top_sources(conn, since, until, limit=10):
+    """[since, until] 期間新聞最多的媒體"""
+    return _query(conn, "SELECT source, SUM(headlines) AS headlines FROM news_daily "
+                        "WHERE day BETWEEN ? AND ? AND member = '' AND source != '' GROUP BY source "
+                        "ORDER BY headlines DESC LIMIT ?",
+                  (_day(since), _day(until), limit))
+
+
+def search_terms(text):
+    return text.split()
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _search_titles(conn, terms, limit, schema="main"):
+    """search_news / search_archive 共用的標題搜尋；schema 是 main 或 ATTACH 進來的 archive"""
+    long_terms = [t for t in terms if len(t) >= 3]
+    short_terms = [t for t in terms if len(t) < 3]
+    columns = ", ".join(f"m.{c}" for c in NEWS_COLUMNS.split(", "))
+    where, params = [], []
+    for term in short_terms:
+        where.append("m.news LIKE ? ESCAPE '\\'")
+        params.append("%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+
+    if long_terms:
+        sql = (f"SELECT {columns} FROM {schema}.news_fts JOIN {schema}.members m ON m.id = news_fts.rowid "
+               f"WHERE news_fts MATCH ? {''.join(' AND ' + w for w in where)} ORDER BY rank LIMIT ?")
+        params = [" ".join(_fts_phrase(t) for t in long_terms), *params, limit]
+    else:
+        sql = (f"SELECT {columns} FROM {schema}.members m WHERE {' AND '.join(where)} "
+               f"ORDER BY m.pub_date DESC, m.id DESC LIMIT ?")
+        params = [*params, limit]
+    return _query(conn, sql, params)
+
+
+def search_news(conn, text, limit=20):
+    """全文搜尋標題，每個詞都要出現，依相關度 (bm25) 排序
+
+    trigram 索引只能找 3 個字以上的詞；像「小娟」這種短詞改用 LIKE 在結果裡再篩一次。
+    標題找到的不夠 limit 則時，再從補抓到的文章摘要 / 內文 (news_body_fts) 找，排在標題結果後面。
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    rows = _search_titles(conn, terms, limit)
+
+    long_terms = [t for t in terms if len(t) >= 3]
+    if long_terms and len(long_terms) == len(terms) and len(rows) < limit:
+        columns = ", ".join(f"m.{c}" for c in NEWS_COLUMNS.split(", "))
+        seen = [row["id"] for row in rows]
+        rows += _query(conn, f"SELECT {columns} FROM news_body_fts JOIN members m ON m.id = news_body_fts.rowid "
+                             f"WHERE news_body_fts MATCH ? AND m.id NOT IN ({', '.join('?' * len(seen))}) "
+                             f"ORDER BY rank LIMIT ?",
+                       [" ".join(_fts_phrase(t) for t in long_terms), *seen, limit - len(rows)])
+    return rows
+
+
+def _collapse_stories(rows, limit, seen):
+    # 依群合併：每個新聞事件只留第一則 (最相關的)；seen 是已經出現過的群，會一起更新
+    stories = []
+    for row in rows:
+        cluster_id = row["cluster_id"] or row["id"]
+        if cluster_id not in seen:
+            seen.add(cluster_id)
+            stories.append(dict(row))
+        if len(stories) >= limit:
+            break
+    return stories
+
+
+def search_stories(conn, text, limit=20, archive=True):
+    """search_news 的結果依群合併：每個新聞事件只留最相關的那則
+
+    跟 latest_stories 一樣附上 articles、outlets、description 與 excerpt。
+    熱資料找到的不夠 limit 則、而且有封存資料庫時 (archive=True)，再到封存裡找，排在後面 (archived=True)。
+    """
+    seen = set()
+    stories = _collapse_stories(search_news(conn, text, limit * 3), limit, seen)
+    sizes, bodies = {}, {}
+    if stories:
+        clusters = [story["cluster_id"] or story["id"] for story in stories]
+        sizes = {row[0]: row[1:] for row in conn.execute(
+            f"SELECT id, articles, outlets FROM news_clusters WHERE id IN ({', '.join('?' * len(clusters))})",
+            clusters)}
+        ids = [story["id"] for story in stories]
+        bodies = {row[0]: row[1:] for row in conn.execute(
+            f"SELECT m.id, COALESCE(b.description, m.summary), b.excerpt FROM members m "
+            f"LEFT JOIN news_bodies b ON b.news_id = m.id WHERE m.id IN ({', '.join('?' * len(ids))})", ids)}
+    for story in stories:
+        story["articles"], story["outlets"] = sizes.get(story["cluster_id"] or story["id"], (1, 1))
+        story["description"], story["excerpt"] = bodies.get(story["id"], (None, None))
+        story["archived"] = False
+
+    if archive and search_terms(text) and len(stories) < limit:
+        with archive_attached(conn) as attached:
+            if attached:
+                stories += search_archive(conn, text, limit - len(stories), seen)
+    return stories
+
+
+# ==========================================
+# 🗄️ 封存資料庫 (Archive)
+# ==========================================
+# 封存資料庫跟主資料庫用同樣的表名 (members / news_fts)，搜尋的 SQL 只要換 schema 就能共用。
+# SQLite 本身不壓縮頁面，所以佔空間的摘要 / 內文存成 zlib 壓縮的 BLOB；
+# 只建標題的全文索引，LSH、成員標記、補抓佇列這些只有熱資料才需要的表都不搬過去。
+ARCHIVE_COLUMNS = NEWS_COLUMNS + ", item_key, exported_in"
+ARCHIVE_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS archive.members (
+        id INTEGER PRIMARY KEY,
+        name TEXT,
+        news TEXT,
+        pub_date TEXT,
+        link TEXT,
+        source TEXT,
+        member TEXT,
+        fetched_at TEXT,
+        cluster_id INTEGER,
+        item_key TEXT,
+        exported_in TEXT,
+        body_url TEXT,
+        description BLOB,
+        excerpt BLOB,
+        archived_at TEXT
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS archive.idx_members_pub_date ON members (pub_date)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_members_cluster ON members (cluster_id, source)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS archive.news_fts USING fts5("
+    "news, content='members', content_rowid='id', tokenize='trigram')",
+]
+
+
+def _pack_text(text):
+    return zlib.compress(text.encode("utf-8"), 9) if text else None
+
+
+def _unpack_text(blob):
+    return zlib.decompress(blob).decode("utf-8") if blob else None
+
+
+@contextmanager
+def archive_attached(conn, path=None, readonly=True):
+    """把封存資料庫 ATTACH 成 archive schema，離開時 DETACH
+
+    readonly=True (搜尋用) 以唯讀模式開啟，檔案不存在時 yield False；
+    readonly=False (retention.py 搬資料用) 會在需要時建立檔案與資料表。
+    ATTACH / DETACH 不能在 transaction 裡做，呼叫前後都要先 commit。
+    """
+    path = path or ARCHIVE_PATH
+    if readonly and not os.path.exists(path):
+        yield False
+        return
+    uri = "file:" + pathname2url(os.path.abspath(path)) + ("?mode=ro" if readonly else "?mode=rwc")
+    conn.execute("ATTACH DATABASE ? AS archive", (uri,))
+    try:
+        if not readonly:
+            # 封存檔只有 retention 會寫，用一般的 rollback journal，不會多出 -wal / -shm 檔
+            conn.execute("PRAGMA archive.journal_mode=DELETE")
+            with conn:
+                for sql in ARCHIVE_SCHEMA:
+                    conn.execute(sql)
+        yield True
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute("DETACH DATABASE archive")
+
+
+def expired_news_ids(conn, cutoff, limit=BATCH_SIZE):
+    """發佈時間早於 cutoff、已經匯出、所屬的群也沒有更新的新聞：[id]
+
+    同一個群的新聞一起搬，熱資料裡不會留下找不到第一則的群。
+    還沒匯出的不搬：封存資料庫不進 git，exports/ 才是留在倉庫裡的完整歷史。
+    """
+    return [row[0] for row in conn.execute(
+        "SELECT id FROM members WHERE (pub_date < ? OR (pub_date IS NULL AND COALESCE(fetched_at, '') < ?)) "
+        "AND exported_in IS NOT NULL "
+        "AND (cluster_id IS NULL OR cluster_id NOT IN (SELECT id FROM news_clusters WHERE last_pub_date >= ?)) "
+        "LIMIT ?", (cutoff, cutoff, cutoff, limit))]
+
+
+def archive_news(conn, ids, archived_at):
+    """把這些新聞 (連同補抓到的內文) 複製到 ATTACH 進來的封存資料庫，回傳複製筆數
+
+    已經在封存裡的會略過，所以中途中斷後重跑不會重複。不會自己 commit。
+    """
+    placeholders = ", ".join("?" * len(ids))
+    existing = {row[0] for row in conn.execute(f"SELECT id FROM archive.members WHERE id IN ({placeholders})", ids)}
+    ids = [news_id for news_id in ids if news_id not in existing]
+    if not ids:
+        return 0
+    placeholders = ", ".join("?" * len(ids))
+    columns = ", ".join(f"m.{c}" for c in ARCHIVE_COLUMNS.split(", "))
+    rows = conn.execute(f"SELECT {columns}, b.url, COALESCE(b.description, m.summary), b.excerpt FROM members m "
+                        f"LEFT JOIN news_bodies b ON b.news_id = m.id WHERE m.id IN ({placeholders})", ids).fetchall()
+    conn.executemany(f"INSERT INTO archive.members ({ARCHIVE_COLUMNS}, body_url, description, excerpt, archived_at) "
+                     f"VALUES ({', '.join('?' * (len(ARCHIVE_COLUMNS.split(', ')) + 4))})",
+                     [(*row[:-2], _pack_text(row[-2]), _pack_text(row[-1]), archived_at) for row in rows])
+    conn.execute(f"INSERT INTO archive.news_fts (rowid, news) SELECT id, news FROM archive.members "
+                 f"WHERE id IN ({placeholders})", ids)
+    return len(rows)
+
+
+def drop_archived_news(conn, ids):
+    """從熱資料刪掉已經封存的新聞，回傳刪除筆數；不會自己 commit
+
+    成員標記、簽章、補抓佇列、全文索引由 trigger 一起清掉；news_lsh 沒有 news_id 的索引，
+    這裡用簽章重算出桶號，直接依主鍵刪。item_key 留在 archived_keys，之後同一則不會再寫進來。
+    """
+    placeholders = ", ".join("?" * len(ids))
+    lsh = [(band, bucket, news_id)
+           for news_id, blob in conn.execute(
+               f"SELECT news_id, signature FROM news_minhash WHERE news_id IN ({placeholders})", ids)
+           for band, bucket in clustering.bands(clustering.unpack(blob))]
+    conn.executemany("DELETE FROM news_lsh WHERE band = ? AND bucket = ? AND news_id = ?", lsh)
+    conn.execute(f"INSERT OR IGNORE INTO archived_keys (item_key) SELECT item_key FROM members "
+                 f"WHERE id IN ({placeholders}) AND item_key IS NOT NULL", ids)
+    return conn.execute(f"DELETE FROM members WHERE id IN ({placeholders})", ids).rowcount
+
+
+def archive_expired(conn, cutoff, archived_at, batch_size=BATCH_SIZE):
+    """把 expired_news_ids() 一批一批搬到 ATTACH 進來的封存資料庫，回傳搬走筆數
+
+    每一批先寫進封存並 commit，再從主資料庫刪掉；中途中斷時最多是兩邊都有 (重跑會略過已封存的)，不會兩邊都沒有。
+    """
+    moved = 0
+    while True:
+        ids = expired_news_ids(conn, cutoff, batch_size)
+        if not ids:
+            return moved
+        with conn:
+            archive_news(conn, ids, archived_at)
+        with conn:
+            moved += drop_archived_news(conn, ids)
+
+
+def search_archive(conn, text, limit=20, seen=None):
+    """在 ATTACH 進來的封存資料庫裡搜尋標題，依群合併 (格式同 search_stories，archived=True)
+
+    seen 是已經出現在熱資料結果裡的群，這裡不會再列一次。
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    seen = set() if seen is None else seen
+    stories = _collapse_stories(_search_titles(conn, terms, limit * 3, "archive"), limit, seen)
+    if not stories:
+        return []
+    ids = [story["id"] for story in stories]
+    clusters = [story["cluster_id"] for story in stories if story["cluster_id"] is not None]
+    sizes = {row[0]: row[1:] for row in conn.execute(
+        f"SELECT cluster_id, COUNT(*), COUNT(DISTINCT source) FROM archive.members "
+        f"WHERE cluster_id IN ({', '.join('?' * len(clusters))}) GROUP BY cluster_id", clusters)}
+    bodies = {row[0]: row[1:] for row in conn.execute(
+        f"SELECT id, description, excerpt FROM archive.members WHERE id IN ({', '.join('?' * len(ids))})", ids)}
+    for story in stories:
+        story["articles"], story["outlets"] = sizes.get(story["cluster_id"], (1, 1))
+        description, excerpt = bodies.get(story["id"], (None, None))
+        story["description"], story["excerpt"] = _unpack_text(description), _unpack_text(excerpt)
+        story["archived"] = True
+    return stories
@@ -0,0 +1,118 @@
+import unicodedata
+from collections import deque
+
+# ==========================================
+# 🏷️ 成員別名 (Member Aliases)
+# ==========================================
+# 英文 / 韓文 / 中文 (繁簡) 名字都算；比對前會做 NFKC + casefold
+MEMBER_ALIASES = {
+    "Miyeon": ["Miyeon", "Mi-yeon", "Cho Miyeon", "미연", "조미연", "美延", "趙美延", "赵美延"],
+    "Minnie": ["Minnie", "Nicha Yontararak", "민니", "明尼", "Minnie Nicha"],
+    "Soyeon": ["Soyeon", "So-yeon", "Jeon Soyeon", "소연", "전소연", "小娟", "田小娟"],
+    "Yuqi": ["Yuqi", "Song Yuqi", "우기", "송우기", "雨琦", "宋雨琦"],
+    "Shuhua": ["Shuhua", "Yeh Shuhua", "슈화", "舒華", "舒华", "葉舒華", "叶舒华"],
+}
+
+
+# ==========================================
+# 🔍 多字串比對 (Aho-Corasick)
+# ==========================================
+class Matcher:
+    """Aho-Corasick 自動機：不管有幾個別名，每個標題只要從頭到尾掃一次
+
+    英數字的別名要求前後不是英數字 (避免 "Yuqi" 命中 "Yuqin")；只看 ASCII 的英數字，
+    標題常把英文名字直接接在中韓文旁邊 ("Soyeon發新歌")，那樣也算。中韓文別名沒有空白分詞，不檢查邊界。
+    """
+
+    def __init__(self, patterns):
+        # patterns: {別名: 標籤}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for alias, label in patterns.items():
+            self._add(_normalize(alias), label)
+        self._build()
+
+    def _add(self, word, label):
+        node = 0
+        for ch in word:
+            if ch not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[node][ch] = len(self.goto) - 1
+            node = self.goto[node][ch]
+        self.output[node].append((len(word), label, word.isascii()))
+
+    def _build(self):
+        # 廣度優先建立失敗連結
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        """回傳 text 裡出現過的標籤 (set)"""
+        text = _normalize(text)
+        found = set()
+        node = 0
+        for end, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, label, ascii_word in self.output[node]:
+                if label in found:
+                    continue
+                start = end - length + 1
+                if ascii_word and not _is_boundary(text, start, end):
+                    continue
+                found.add(label)
+        return found
+
+
+def _normalize(text):
+    # 全形轉半形、不分大小寫；不壓縮空白，位置才對得上
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def _is_boundary(text, start, end):
+    # str.isalnum() 對中文、韓文也是 True，這裡只把 ASCII 英數字當成同一個字
+    before = text[start - 1] if start > 0 else " "
+    after = text[end + 1] if end + 1 < len(text) else " "
+    return not _is_word_char(before) and not _is_word_char(after)
+
+
+def _is_word_char(ch):
+    return ch.isascii() and ch.isalnum()
+
+
+_matcher = None
+
+
+def matcher():
+    """預先編譯好的比對器 (每個行程只建一次)"""
+    global _matcher
+    if _matcher is None:
+        _matcher = Matcher({alias: member for member, aliases in MEMBER_ALIASES.items() for alias in aliases})
+    return _matcher
+
+
+def tag_members(title):
+    """標題提到了哪些成員 (排序過的 list)
+
+    >>> tag_members("Soyeon發新歌")
+    ['Soyeon']
+    >>> tag_members("(G)I-DLE成員Yuqi驚喜亮相")
+    ['Yuqi']
+    >>> tag_members("MINNIE의 솔로")
+    ['Minnie']
+    >>> tag_members("Yuqin 不是成員")
+    []
+    """
+    return sorted(matcher().find(title))